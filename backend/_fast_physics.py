@@ -0,0 +1,137 @@
+"""
+Numba-compiled per-tick kernels for the agent drivers.
+
+Compiled functions are cached on disk (cache=True), so the JIT cost is
+paid on the first run only.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def seed(value: int) -> None:
+    """Seed Numba's RNG, which is separate from NumPy's global state."""
+    np.random.seed(value)
+
+
+@njit(cache=True, fastmath=True)
+def update_aggressive(
+    speed: float,
+    heading: float,
+    x: float,
+    y: float,
+    aggression: float,
+    drift_factor: float,
+) -> Tuple[float, float, float, float]:
+    """One tick of AggressiveDriverAgent movement. Returns (speed, heading, x, y)."""
+
+    # Aggressive acceleration/braking randomly
+    if np.random.random() < 0.65:
+        speed += np.random.uniform(1.5, 4.5) * aggression
+    else:
+        speed -= np.random.uniform(1.0, 3.5)
+
+    # Clamp speed
+    speed = max(10.0, min(speed, 60.0))
+
+    # Random steering changes (aggressive correction)
+    heading += np.random.uniform(-8.0, 8.0) * drift_factor
+
+    # Normalize heading to [0, 360)
+    heading = heading % 360.0
+
+    direction = 1.0 if np.random.random() > 0.1 else -1.0
+    x += speed * 0.1 * np.random.uniform(0.9, 1.1) * direction * (0.5 + np.random.random())
+    y += speed * 0.1 * np.random.uniform(-1.2, 1.2)
+
+    return speed, heading, x, y
+
+
+# Rows of the segment table advance_agents reads: start point, delta to the
+# next point, 1 / segment length and heading (degrees)
+TRACK_X, TRACK_Y, TRACK_DX, TRACK_DY, TRACK_INV_LEN, TRACK_HEADING = range(6)
+TRACK_ROWS = 6
+
+# Agent count from which SimulationEngine uses advance_agents_parallel;
+# below it, starting the thread pool costs more than it saves
+PARALLEL_THRESHOLD = 4096
+
+
+def _advance_agents(
+    rows: np.ndarray,
+    throttle: np.ndarray,
+    brake: np.ndarray,
+    speed: np.ndarray,
+    segment_index: np.ndarray,
+    segment_progress: np.ndarray,
+    lap: np.ndarray,
+    status: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    heading: np.ndarray,
+    track: np.ndarray,
+    dt: float,
+    max_laps: int,
+    finished_code: int,
+    laps_done: np.ndarray,
+) -> None:
+    """
+    One tick of SimulationEngine movement for agents `rows`, in place on the
+    AgentsSoA columns. Agent rows[k] uses throttle[k]/brake[k]; laps_done[k]
+    receives the laps it completed this tick (the engine logs them).
+    `track` is the (TRACK_ROWS, n_seg) segment table; one array rather than
+    six keeps the per-call argument unboxing down. Agents are independent,
+    so the loop is a prange.
+    """
+    seg_x = track[TRACK_X]
+    seg_y = track[TRACK_Y]
+    seg_dx = track[TRACK_DX]
+    seg_dy = track[TRACK_DY]
+    inv_seg_len = track[TRACK_INV_LEN]
+    seg_heading = track[TRACK_HEADING]
+    n_seg = track.shape[1]
+    # Speed km/h ~> "track units" per tick (completely fake scaling)
+    units_per_tick = 0.01 * dt
+    for k in prange(rows.shape[0]):
+        i = rows[k]
+
+        # Very simple longitudinal dynamics
+        accel = 8.0 * throttle[k] - 10.0 * brake[k]  # m/s^2-ish
+        v = min(max(speed[i] + accel * dt, 0.0), 260.0)
+        speed[i] = v
+
+        seg = segment_index[i]
+        prog = segment_progress[i] + v * units_per_tick * inv_seg_len[seg]
+
+        # Carry progress over segment boundaries; every pass through
+        # segment 0 completes a lap
+        crossed = int(prog)
+        done = 0
+        if crossed:
+            done = (seg + crossed) // n_seg
+            if done and lap[i] + done >= max_laps:
+                # Finished: stop on the line at the start of segment 0
+                done = max(max_laps - lap[i], 1)
+                crossed = done * n_seg - seg
+                status[i] = finished_code
+            lap[i] += done
+            seg = (seg + crossed) % n_seg
+            prog -= crossed
+        segment_index[i] = seg
+        segment_progress[i] = prog
+        laps_done[k] = done
+
+        x[i] = seg_x[seg] + seg_dx[seg] * prog
+        y[i] = seg_y[seg] + seg_dy[seg] * prog
+        heading[i] = seg_heading[seg]
+
+
+advance_agents = njit(cache=True, nogil=True)(_advance_agents)
+
+# Threaded variant. Not cached: a second cached dispatcher of the same Python
+# function would share advance_agents' cache entry, so this one compiles on
+# first use (only grids of PARALLEL_THRESHOLD agents or more get here).
+advance_agents_parallel = njit(nogil=True, parallel=True)(_advance_agents)
@@ -1,6 +1,35 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-import random
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+import numpy as np
+
+from .models import Observation, WET
+
+
+# Noise draws per refill of SimpleRuleBasedAgent's buffer
+_NOISE_BUFFER = 4096
+
+# SimpleRuleBasedAgent base target speed by personality (default 200)
+_TARGET_SPEED = {"aggressive": 230.0, "cautious": 180.0}
+
+
+class BatchController(Protocol):
+    """
+    Chooses actions for a fixed group of agents in one call. Column j of the
+    group is its j-th agent; `cols` are the columns still racing, and the
+    other arrays hold those agents' observations in the same order.
+    """
+
+    def choose_action_batch(
+        self,
+        cols: np.ndarray,
+        speeds: np.ndarray,
+        laps: np.ndarray,
+        segs: np.ndarray,
+        progs: np.ndarray,
+        wet: bool,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """returns (throttle, brake) arrays, each 0..1"""
+        ...
 
 
 class BaseAgent(ABC):
@@ -10,19 +39,17 @@ class BaseAgent(ABC):
         self.personality = personality
 
     @abstractmethod
-    def choose_action(self, obs: Dict[str, Any]) -> Dict[str, float]:
+    def choose_action(self, obs: Observation) -> Dict[str, float]:
         """
-        obs: {
-          'speed': float,
-          'lap': int,
-          'segment_index': int,
-          'segment_progress': float,
-          'weather': str,
-        }
+        obs: Observation (speed, lap, segment_index, segment_progress,
+          weather: DRY/WET); reused by the engine, so don't keep a reference to it
         returns: {'throttle': 0..1, 'brake': 0..1}
         """
         ...
 
+    def reset(self) -> None:
+        """Called by SimulationEngine.reset() before a new race; no-op by default."""
+
 
 class SimpleRuleBasedAgent(BaseAgent):
     """
@@ -30,25 +57,33 @@ class SimpleRuleBasedAgent(BaseAgent):
     personality: 'aggressive', 'cautious', 'neutral'
     """
 
-    def choose_action(self, obs: Dict[str, Any]) -> Dict[str, float]:
-        speed = obs["speed"]
-        segment_progress = obs["segment_progress"]
-        weather = obs.get("weather", "dry")
+    def __init__(
+        self,
+        agent_id: str,
+        color: str,
+        personality: str = "neutral",
+        rng: Optional[np.random.Generator] = None,
+    ):
+        super().__init__(agent_id, color, personality)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # (throttle, brake) noise pairs, drawn in one NumPy call per refill
+        self._noise: List[List[float]] = []
+        self._noise_i = 0
+
+    def choose_action(self, obs: Observation) -> Dict[str, float]:
+        speed = obs.speed
+        segment_progress = obs.segment_progress
+        weather = obs.weather
 
         # Base target speeds by personality
-        if self.personality == "aggressive":
-            target_speed = 230.0
-        elif self.personality == "cautious":
-            target_speed = 180.0
-        else:
-            target_speed = 200.0
+        target_speed = _TARGET_SPEED.get(self.personality, 200.0)
 
         # Slow down slightly in the middle of segments (fake corners)
         if 0.3 < segment_progress < 0.7:
             target_speed *= 0.85
 
         # Weather effect
-        if weather == "wet":
+        if weather == WET:
             target_speed *= 0.8
 
         throttle = 0.0
@@ -62,25 +97,92 @@ class SimpleRuleBasedAgent(BaseAgent):
             throttle = 0.3
 
         # Add some noise so different agents behave differently
-        throttle = max(0.0, min(1.0, throttle + random.uniform(-0.05, 0.05)))
-        brake = max(0.0, min(1.0, brake + random.uniform(-0.05, 0.05)))
+        if self._noise_i == 0:
+            self._noise = self.rng.uniform(-0.05, 0.05, (_NOISE_BUFFER, 2)).tolist()
+        throttle_noise, brake_noise = self._noise[self._noise_i]
+        self._noise_i = (self._noise_i + 1) % _NOISE_BUFFER
+
+        throttle = max(0.0, min(1.0, throttle + throttle_noise))
+        brake = max(0.0, min(1.0, brake + brake_noise))
 
         return {"throttle": throttle, "brake": brake}
 
+    @classmethod
+    def make_batch(cls, agents: Sequence["SimpleRuleBasedAgent"]) -> "RuleBasedBatch":
+        """BatchController acting for `agents` (in that column order)."""
+        return RuleBasedBatch(agents)
+
+
+class RuleBasedBatch:
+    """
+    SimpleRuleBasedAgent's rules evaluated for a group of agents at once.
+    Noise comes from the first agent's rng, one (throttle, brake) pair per
+    agent per call, drawn in (_NOISE_BUFFER, agents, 2) blocks.
+    """
+
+    def __init__(self, agents: Sequence[SimpleRuleBasedAgent]):
+        self.agents = list(agents)
+        self.rng = self.agents[0].rng
+        self._target_speed = np.array(
+            [_TARGET_SPEED.get(a.personality, 200.0) for a in self.agents]
+        )
+        self._noise: Optional[np.ndarray] = None
+        self._noise_i = 0
+
+    def choose_action_batch(
+        self,
+        cols: np.ndarray,
+        speeds: np.ndarray,
+        laps: np.ndarray,
+        segs: np.ndarray,
+        progs: np.ndarray,
+        wet: bool,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Slow down slightly in the middle of segments (fake corners)
+        target_speed = self._target_speed[cols]
+        target_speed = np.where((progs > 0.3) & (progs < 0.7), target_speed * 0.85, target_speed)
+
+        # Weather effect
+        if wet:
+            target_speed = target_speed * 0.8
+
+        slow = speeds < target_speed - 5
+        fast = speeds > target_speed + 5
+        throttle = np.where(slow, 1.0, np.where(fast, 0.0, 0.3))
+        brake = fast.astype(np.float64)
+
+        # Add some noise so different agents behave differently
+        if self._noise_i == 0:
+            self._noise = self.rng.uniform(
+                -0.05, 0.05, (_NOISE_BUFFER, len(self.agents), 2)
+            )
+        noise = self._noise[self._noise_i, cols]
+        self._noise_i = (self._noise_i + 1) % _NOISE_BUFFER
+
+        throttle = np.clip(throttle + noise[:, 0], 0.0, 1.0)
+        brake = np.clip(brake + noise[:, 1], 0.0, 1.0)
+        return throttle, brake
+
 
 class RLAgent(BaseAgent):
     """
     Placeholder for RL-controlled agent – you can plug in a trained policy later.
     """
 
-    def __init__(self, agent_id: str, color: str, policy=None):
+    def __init__(
+        self,
+        agent_id: str,
+        color: str,
+        policy=None,
+        rng: Optional[np.random.Generator] = None,
+    ):
         super().__init__(agent_id, color, personality="rl")
         self.policy = policy
+        # fallback to neutral rule-based behavior; kept so its noise buffer is reused
+        self._fallback = SimpleRuleBasedAgent(agent_id, color, "neutral", rng)
 
-    def choose_action(self, obs: Dict[str, Any]) -> Dict[str, float]:
+    def choose_action(self, obs: Observation) -> Dict[str, float]:
         if self.policy is None:
-            # fallback to neutral rule-based behavior
-            neutral = SimpleRuleBasedAgent(self.id, self.color, "neutral")
-            return neutral.choose_action(obs)
+            return self._fallback.choose_action(obs)
         # Example shape – adapt when you have a real model
         return self.policy(obs)
@@ -1,7 +1,9 @@
-import random
-from typing import Dict
+from typing import Dict, Optional
 
-from backend.models import AgentState
+import numpy as np
+
+from backend.models import AgentState, Observation
+from backend._fast_physics import update_aggressive
 
 
 class AggressiveDriverAgent:
@@ -14,46 +16,47 @@ class AggressiveDriverAgent:
       - Higher chance of overshooting corners
     """
 
-    def __init__(self, agent_id: str, color: str = "#FF2D2D"):
+    def __init__(
+        self,
+        agent_id: str,
+        color: str = "#FF2D2D",
+        rng: Optional[np.random.Generator] = None,
+    ):
         self.id = agent_id
         self.color = color
+        self.rng = rng = rng if rng is not None else np.random.default_rng()
 
         # Base driving parameters
-        self.speed = random.uniform(18, 28)  # m/s (65–100 km/h)
-        self.heading = random.uniform(0, 360)
-        self.x = random.uniform(200, 400)
-        self.y = random.uniform(200, 350)
+        self.speed = rng.uniform(18, 28)  # m/s (65–100 km/h)
+        self.heading = rng.uniform(0, 360)
+        self.x = rng.uniform(200, 400)
+        self.y = rng.uniform(200, 350)
 
         # Behaviour multipliers
-        self.aggression = random.uniform(1.3, 2.2)
-        self.drift_factor = random.uniform(0.8, 1.6)
+        self.aggression = rng.uniform(1.3, 2.2)
+        self.drift_factor = rng.uniform(0.8, 1.6)
 
     def update(self):
         """Simulates movement per tick"""
+        self.speed, self.heading, self.x, self.y = update_aggressive(
+            self.speed, self.heading, self.x, self.y, self.aggression, self.drift_factor
+        )
 
-        # Aggressive acceleration/braking randomly
-        if random.random() < 0.65:
-            self.speed += random.uniform(1.5, 4.5) * self.aggression
-        else:
-            self.speed -= random.uniform(1.0, 3.5)
-
-        # Clamp speed
-        self.speed = max(10, min(self.speed, 60))
-
-        # Random steering changes (aggressive correction)
-        self.heading += random.uniform(-8, 8) * self.drift_factor
-
-        # Normalize heading
-        if self.heading < 0:
-            self.heading += 360
-        elif self.heading >= 360:
-            self.heading -= 360
+    def choose_action(self, obs: Observation) -> Dict[str, float]:
+        """
+        Pedal inputs for SimulationEngine's track model, with update()'s
+        split: floor it on 65% of ticks, otherwise brake by a random amount.
 
-        # Update position using heading angle
-        rad = self.heading * (3.14159 / 180)
+        obs: Observation (unused: this driver doesn't read the track)
+        returns: {'throttle': 0..1, 'brake': 0..1}
+        """
+        if self.rng.random() < 0.65:
+            return {"throttle": 1.0, "brake": 0.0}
+        # update()'s 1.0-3.5 m/s slow-down, as a fraction of the hardest
+        return {"throttle": 0.0, "brake": self.rng.uniform(1.0, 3.5) / 3.5}
 
-        self.x += self.speed * 0.1 * (random.uniform(0.9, 1.1)) * (1 if random.random() > 0.1 else -1) * (0.5 + random.random())
-        self.y += self.speed * 0.1 * random.uniform(-1.2, 1.2)
+    def reset(self) -> None:
+        """Called by SimulationEngine.reset(); keeps the current movement state."""
 
     def get_state(self) -> Dict:
         """Return full state for API response"""
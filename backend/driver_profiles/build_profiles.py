@@ -13,6 +13,9 @@ It does NOT touch your FastAPI backend or frontend.
 from __future__ import annotations
 
 import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -20,6 +23,11 @@ from typing import Dict, List, Optional
 import fastf1
 import numpy as np
 import pandas as pd
+from numba import njit
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 
 # ---------- CONFIG YOU CAN TWEAK LATER ---------- #
@@ -96,56 +104,113 @@ def ensure_cache():
 
 # ---------- FEATURE ENGINEERING ---------- #
 
-def _normalise_percent(series: pd.Series) -> pd.Series:
+def _column(records, field: str) -> np.ndarray:
+    """Pull one float field out of a list of dataclasses as a NumPy array."""
+    return np.fromiter(
+        (getattr(r, field) for r in records), dtype=np.float64, count=len(records)
+    )
+
+
+def detect_scale(telemetry: pd.DataFrame, channel: str) -> float:
     """
     FastF1 sometimes gives Throttle/Brake as 0–100, sometimes 0–1.
-    Normalise everything to 0–1.
+    The scale is fixed for a session, so check it once on the driver's
+    telemetry and return the multiplier that normalises `channel` to 0–1.
     """
+    series = telemetry[channel]
     if series.empty:
-        return series
-    max_val = float(series.max())
-    if max_val == 0:
-        return series
-    if max_val > 1.5:  # assume it's 0–100
-        return series / 100.0
-    return series
+        return 1.0
+    if float(series.max()) > 1.5:  # assume it's 0–100
+        return 1 / 100.0
+    return 1.0
 
 
-def extract_lap_features(lap) -> Optional[LapFeatures]:
+@njit(cache=True)
+def _telemetry_stats(speed, throttle, brake):
+    """
+    One pass over a lap's samples. Returns the speed count/sum/sum of
+    squares/max (NaN samples skipped, like pandas) and the number of
+    full-throttle, heavy-brake and coasting samples.
     """
-    Given a single FastF1 Lap object, compute lap-level features.
+    n_speed = 0
+    speed_sum = 0.0
+    speed_sumsq = 0.0
+    speed_max = -np.inf
+    n_full = 0
+    n_heavy = 0
+    n_coast = 0
+
+    for i in range(speed.size):
+        v = speed[i]
+        if not np.isnan(v):
+            n_speed += 1
+            speed_sum += v
+            speed_sumsq += v * v
+            if v > speed_max:
+                speed_max = v
+
+        t = throttle[i]
+        b = brake[i]
+        if t > 0.9:
+            n_full += 1
+        if b > 0.7:
+            n_heavy += 1
+        if t < 0.1 and b < 0.1:
+            n_coast += 1
+
+    return n_speed, speed_sum, speed_sumsq, speed_max, n_full, n_heavy, n_coast
+
+
+def extract_lap_features(
+    lap,
+    tel: pd.DataFrame,
+    throttle_scale: float = 1.0,
+    brake_scale: float = 1.0,
+) -> Optional[LapFeatures]:
+    """
+    Given one lap row (a FastF1 Lap or a Laps.itertuples() record) and the
+    telemetry samples recorded during it, compute lap-level features.
+    Throttle/Brake are multiplied by the session scales from detect_scale().
     Returns None if telemetry is missing or LapTime is invalid.
     """
     if pd.isna(lap.LapTime):
         return None
 
-    try:
-        tel = lap.get_telemetry().add_distance()
-    except Exception:
-        # Some old laps / sessions can fail to load telemetry
-        return None
-
     if tel.empty:
         return None
 
-    speeds = tel["Speed"]
-    throttle = _normalise_percent(tel["Throttle"])
-    brake = _normalise_percent(tel["Brake"])
-
-    mean_speed = float(speeds.mean())
-    max_speed = float(speeds.max())
-    speed_std = float(speeds.std())
+    speeds = tel["Speed"].to_numpy(dtype=np.float64)
+    throttle = tel["Throttle"].to_numpy(dtype=np.float64) * throttle_scale
+    brake = tel["Brake"].to_numpy(dtype=np.float64) * brake_scale
+    n = speeds.size
+
+    (
+        n_speed,
+        speed_sum,
+        speed_sumsq,
+        speed_max,
+        n_full,
+        n_heavy,
+        n_coast,
+    ) = _telemetry_stats(speeds, throttle, brake)
+
+    mean_speed = speed_sum / n_speed if n_speed else float("nan")
+    max_speed = float(speed_max) if n_speed else float("nan")
+    # Sample std (ddof=1), matching pandas' Series.std()
+    if n_speed > 1:
+        speed_var = (speed_sumsq - speed_sum * mean_speed) / (n_speed - 1)
+        speed_std = float(np.sqrt(max(speed_var, 0.0)))
+    else:
+        speed_std = float("nan")
 
     # Fraction of samples > 90% throttle
-    full_throttle_pct = float((throttle > 0.9).mean())
+    full_throttle_pct = n_full / n
 
     # Fraction of samples with heavy braking (> 70% input)
-    heavy_brake_pct = float((brake > 0.7).mean())
+    heavy_brake_pct = n_heavy / n
 
     # Fraction of samples where neither throttle nor brake is used much
-    coasting_pct = float(
-        ((throttle < 0.1) & (brake < 0.1)).mean()
-    )
+    coasting_pct = n_coast / n
 
     lap_time_s = float(lap.LapTime.total_seconds())
 
@@ -187,25 +252,40 @@ def aggregate_session(
     # Take up to N fastest laps
     laps = laps.nsmallest(max_laps, "LapTime")
 
+    # One car-data slice covering every selected lap, cut per lap below
+    try:
+        car_data = laps.get_car_data()
+    except Exception:
+        # Some old laps / sessions can fail to load telemetry
+        return None
+
+    throttle_scale = detect_scale(car_data, "Throttle")
+    brake_scale = detect_scale(car_data, "Brake")
+    session_time = car_data["SessionTime"]
+
     feature_objects: List[LapFeatures] = []
-    for _, lap in laps.iterrows():
-        lf = extract_lap_features(lap)
+    for lap in laps.itertuples(index=False):
+        if pd.isna(lap.LapStartTime) or pd.isna(lap.Time):
+            continue
+        start = session_time.searchsorted(lap.LapStartTime, side="left")
+        end = session_time.searchsorted(lap.Time, side="right")
+        lf = extract_lap_features(
+            lap, car_data.iloc[start:end], throttle_scale, brake_scale
+        )
         if lf is not None:
             feature_objects.append(lf)
 
     if not feature_objects:
         return None
 
-    df = pd.DataFrame([asdict(f) for f in feature_objects])
-
     # Basic aggregates
-    laps_used = int(len(df))
-    avg_lap_time_s = float(df["lap_time_s"].mean())
-    mean_speed = float(df["mean_speed"].mean())
-    max_speed = float(df["max_speed"].max())
-    full_throttle_pct = float(df["full_throttle_pct"].mean())
-    heavy_brake_pct = float(df["heavy_brake_pct"].mean())
-    coasting_pct = float(df["coasting_pct"].mean())
+    laps_used = len(feature_objects)
+    avg_lap_time_s = float(_column(feature_objects, "lap_time_s").mean())
+    mean_speed = float(_column(feature_objects, "mean_speed").mean())
+    max_speed = float(_column(feature_objects, "max_speed").max())
+    full_throttle_pct = float(_column(feature_objects, "full_throttle_pct").mean())
+    heavy_brake_pct = float(_column(feature_objects, "heavy_brake_pct").mean())
+    coasting_pct = float(_column(feature_objects, "coasting_pct").mean())
 
     # ---- Rough style metrics (heuristic, but grounded) ----
     # Normalise mean speed relative to a typical F1 top speed (~330 km/h)
@@ -263,6 +343,22 @@ def aggregate_session(
 
 # ---------- TOP-LEVEL PROFILE BUILDER ---------- #
 
+def _load_session(sess_cfg: Dict):
+    """
+    Fetch and load one FastF1 session described by a SESSIONS entry.
+    """
+    logger.info(
+        "=== Loading %s %s %s ===",
+        sess_cfg["year"], sess_cfg["event"], sess_cfg["session"],
+    )
+    session = fastf1.get_session(
+        sess_cfg["year"], sess_cfg["event"], sess_cfg["session"]
+    )
+    # This will fetch timing + telemetry from F1’s live timing servers
+    session.load(laps=True, telemetry=True, weather=False)
+    return session
+
+
 def build_driver_profiles() -> Dict[str, DriverProfile]:
     """
     Loop over SESSIONS × DRIVERS and build profiles.
@@ -278,29 +374,22 @@ def build_driver_profiles() -> Dict[str, DriverProfile]:
             overall={},
         )
 
-    for sess_cfg in SESSIONS:
-        print(
-            f"\n=== Loading {sess_cfg['year']} {sess_cfg['event']} "
-            f"{sess_cfg['session']} ==="
-        )
-        session = fastf1.get_session(
-            sess_cfg["year"], sess_cfg["event"], sess_cfg["session"]
-        )
-        # This will fetch timing + telemetry from F1’s live timing servers
-        session.load(laps=True, telemetry=True, weather=False)
+    # Loads are network/disk bound, so fetch every session concurrently
+    with ThreadPoolExecutor(max_workers=len(SESSIONS)) as ex:
+        loaded_sessions = list(ex.map(_load_session, SESSIONS))
 
+    for session in loaded_sessions:
         for drv in DRIVERS:
             code = drv["code"]
             agg = aggregate_session(session, code)
             if agg is None:
-                print(f"  – No usable laps for {code} in this session")
+                logger.info("  – No usable laps for %s in this session", code)
                 continue
 
             profiles[code].sessions.append(agg)
-            print(
-                f"  – {code}: style={agg.style_tag}, "
-                f"aggr={agg.aggression_score:.2f}, "
-                f"brakeRisk={agg.braking_risk:.2f}"
+            logger.info(
+                "  – %s: style=%s, aggr=%.2f, brakeRisk=%.2f",
+                code, agg.style_tag, agg.aggression_score, agg.braking_risk,
             )
 
     # Now compute overall stats per driver by averaging over sessions
@@ -308,23 +397,23 @@ def build_driver_profiles() -> Dict[str, DriverProfile]:
         if not profile.sessions:
             continue
 
-        df = pd.DataFrame([asdict(s) for s in profile.sessions])
+        sessions = profile.sessions
 
         profile.overall = {
-            "sessions_used": int(len(df)),
-            "avg_lap_time_s": float(df["avg_lap_time_s"].mean()),
-            "mean_speed": float(df["mean_speed"].mean()),
-            "max_speed": float(df["max_speed"].max()),
-            "full_throttle_pct": float(df["full_throttle_pct"].mean()),
-            "heavy_brake_pct": float(df["heavy_brake_pct"].mean()),
-            "coasting_pct": float(df["coasting_pct"].mean()),
-            "aggression_score": float(df["aggression_score"].mean()),
-            "braking_risk": float(df["braking_risk"].mean()),
+            "sessions_used": len(sessions),
+            "avg_lap_time_s": float(_column(sessions, "avg_lap_time_s").mean()),
+            "mean_speed": float(_column(sessions, "mean_speed").mean()),
+            "max_speed": float(_column(sessions, "max_speed").max()),
+            "full_throttle_pct": float(_column(sessions, "full_throttle_pct").mean()),
+            "heavy_brake_pct": float(_column(sessions, "heavy_brake_pct").mean()),
+            "coasting_pct": float(_column(sessions, "coasting_pct").mean()),
+            "aggression_score": float(_column(sessions, "aggression_score").mean()),
+            "braking_risk": float(_column(sessions, "braking_risk").mean()),
         }
 
         # Majority style tag across sessions
-        style_counts = df["style_tag"].value_counts()
-        profile.overall["style_tag"] = str(style_counts.idxmax())
+        style_counts = Counter(s.style_tag for s in sessions)
+        profile.overall["style_tag"] = style_counts.most_common(1)[0][0]
 
     return profiles
 
@@ -351,10 +440,11 @@ def save_profiles_to_json(
     with output_path.open("w", encoding="utf-8") as f:
         json.dump(serialisable, f, indent=2)
 
-    print(f"\nSaved driver profiles to {output_path}")
+    logger.info("Saved driver profiles to %s", output_path)
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     profiles = build_driver_profiles()
     save_profiles_to_json(profiles)
 
@@ -1,23 +1,25 @@
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-import json 
-
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from typing import Dict, Any, List, Optional
 
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 
-from simulation.simulation_engine import SimulationEngine
-from simulation.controllers.driver_style_controller import DriverStyleController
-from montecarlo.montecarlo import MonteCarloSimulator
-
-
+from backend.simulation.simulation_engine import SimulationEngine
+from backend.simulation.controllers.driver_style_controller import (
+    DriverStyleController,
+    load_driver_profiles,
+)
+from backend.monte_carlo import MonteCarloSimulator, init_worker
+from backend.models import SimulationState
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Allow frontend + electron
 origins = [
@@ -36,14 +38,23 @@ app.add_middleware(
 
 
 # ==== LOAD DRIVER AI PROFILES ==== #
-with open("backend/driver_profiles/driver_profiles.json", "r") as f:
-    DRIVER_PROFILES = json.load(f)
+# Parsed once and shared read-only by every controller we build
+DRIVER_PROFILES = load_driver_profiles()
 
 
 # ==== GLOBAL STATE =====
 engine: Optional[SimulationEngine] = None
 _simulation_task: Optional[asyncio.Task] = None
-_latest_state: Optional[Dict[str, Any]] = None
+# JSON bytes of the newest tick, encoded once per tick rather than per poll
+_latest_state: Optional[bytes] = None
+
+# Engine ticks run here so the event loop stays free for HTTP handlers.
+# One worker keeps steps strictly sequential (the engine isn't thread-safe).
+_STEP_POOL = ThreadPoolExecutor(max_workers=1)
+
+# Monte Carlo workers live for the whole app so each request skips the
+# fork + import cost. Created on startup, closed on shutdown.
+_MC_POOL: Optional[ProcessPoolExecutor] = None
 
 
 # === TRACK (temporary until we use PNG racing) ===
@@ -82,6 +93,31 @@ class MonteCarloRequest(BaseModel):
     agents: Optional[List[Dict[str, Any]]] = None
 
 
+def _encode_state(state: SimulationState) -> bytes:
+    return orjson.dumps(state.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# ==== LIFECYCLE ====
+
+@app.on_event("startup")
+async def start_mc_pool():
+    global _MC_POOL
+    # Every API simulation uses TRACK_POINTS, so install it in each worker once
+    _MC_POOL = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=init_worker,
+        initargs=(TRACK_POINTS,),
+    )
+
+
+@app.on_event("shutdown")
+async def stop_mc_pool():
+    global _MC_POOL
+    if _MC_POOL is not None:
+        _MC_POOL.shutdown(cancel_futures=True)
+        _MC_POOL = None
+
+
 # ==== API ROUTES ====
 
 @app.post("/simulation/start")
@@ -93,7 +129,7 @@ async def start_simulation(req: StartSimulationRequest):
     # Inject REAL controllers
     for agent in configs:
         driver_id = agent["id"]
-        controller = DriverStyleController(driver_id, DRIVER_PROFILES[driver_id])
+        controller = DriverStyleController(driver_id, profile=DRIVER_PROFILES[driver_id])
         agent["controller"] = controller  # override fake values
 
     engine = SimulationEngine(
@@ -103,19 +139,22 @@ async def start_simulation(req: StartSimulationRequest):
         max_laps=req.max_laps,
     )
 
-    _latest_state = engine.reset().to_dict()
+    _latest_state = _encode_state(engine.reset())
 
     if _simulation_task:
         _simulation_task.cancel()
 
     async def simulation_loop():
         global _latest_state
+        loop = asyncio.get_running_loop()
         try:
             while True:
                 await asyncio.sleep(req.tick_dt)
                 if engine is None:
                     break
-                _latest_state = engine.step().to_dict()
+                _latest_state = await loop.run_in_executor(
+                    _STEP_POOL, lambda: _encode_state(engine.step())
+                )
         except asyncio.CancelledError:
             pass
 
@@ -126,7 +165,10 @@ async def start_simulation(req: StartSimulationRequest):
 
 @app.get("/simulation/state")
 async def simulation_state():
-    return _latest_state or {"status": "no_simulation"}
+    if _latest_state is None:
+        return {"status": "no_simulation"}
+    # Already JSON; skip FastAPI's encoder entirely
+    return Response(content=_latest_state, media_type="application/json")
 
 
 @app.post("/montecarlo/run")
@@ -140,7 +182,18 @@ async def run_monte_carlo(req: MonteCarloRequest):
         tick_dt=req.tick_dt,
     )
 
-    result = simulator.run(target_agent_id=req.target_agent_id, runs=req.runs)
+    # Races run in worker processes; keep the event loop free while they do
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        None,
+        partial(
+            simulator.run,
+            req.target_agent_id,
+            req.runs,
+            pool=_MC_POOL,
+            shared_track=True,
+        ),
+    )
 
     return result.formatted()
 
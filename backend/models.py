@@ -1,5 +1,16 @@
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+# AgentState.status_code values; STATUS_NAMES gives the API string for each
+RACING, FINISHED, DNF = 0, 1, 2
+STATUS_NAMES = ("RACING", "FINISHED", "DNF")
+
+# SimulationEngine.weather values; WEATHER_NAMES gives the log string for each
+DRY, WET = 0, 1
+WEATHER_NAMES = ("DRY", "WET")
 
 
 @dataclass
@@ -11,22 +22,66 @@ class AgentState:
     heading: float
     speed: float
     lap: int
-    status: str  # "RACING", "PIT", "DNF"
+    status_code: int  # RACING, FINISHED or DNF
 
     segment_index: int
     segment_progress: float  # 0..1 within segment
 
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self.status_code]
+
+
+@dataclass(slots=True)
+class Observation:
+    """
+    What an agent controller sees each tick. The engine keeps one per agent
+    and updates it in place; item access (obs["speed"], obs.get(...)) is
+    kept for controllers written against the old dict observation.
+    """
+
+    speed: float
+    lap: int
+    segment_index: int
+    segment_progress: float
+    weather: int  # DRY or WET
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
 
 @dataclass
 class SimulationState:
     time: float
     agents: List[AgentState]
     event_log: List[str]
+    # int8 status code per agent, same order as `agents` (not serialised)
+    status_codes: Optional[np.ndarray] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "time": self.time,
-            "agents": [asdict(a) for a in self.agents],
+            "agents": [
+                {
+                    "id": a.id,
+                    "color": a.color,
+                    "x": a.x,
+                    "y": a.y,
+                    "heading": a.heading,
+                    "speed": a.speed,
+                    "lap": a.lap,
+                    "status": STATUS_NAMES[a.status_code],
+                    "segment_index": a.segment_index,
+                    "segment_progress": a.segment_progress,
+                }
+                for a in self.agents
+            ],
             "event_log": self.event_log,
         }
 
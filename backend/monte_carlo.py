@@ -1,10 +1,75 @@
-from typing import List, Dict, Any
+import logging
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Any, Optional
 import numpy as np
 
-from backend.models import AgentState, SimulationState
+from backend import _fast_physics
+from backend.models import AgentState, SimulationState, RACING
+from backend.simulation.simulation_engine import SimulationEngine, track_array
 from .models import MonteCarloResult
 
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Below this many runs the process-pool startup costs more than it saves
+_SERIAL_THRESHOLD = 8
+
+# (N, 2) track installed once per worker by init_worker(track_points)
+_TRACK: Optional[np.ndarray] = None
+
+
+def init_worker(track_points: Optional[List[Dict[str, float]]] = None) -> None:
+    """
+    Process-pool initializer. Unpickling this function imports the engine
+    modules once per worker; reseeding keeps forked workers from sharing the
+    parent's RNG state outside the per-race seeds.
+
+    Passing `track_points` stores the track as a worker global so tasks
+    don't have to pickle it each time (see MonteCarloSimulator.run).
+    """
+    global _TRACK
+    random.seed()
+    np.random.seed()
+    if track_points is not None:
+        _TRACK = track_array(track_points)
+
+
+def _race_worker(
+    track: Optional[np.ndarray],
+    agent_configs: List[Dict[str, Any]],
+    tick_dt: float,
+    max_laps: int,
+    seed: int,
+) -> np.ndarray:
+    # None means "use the track this worker was initialised with"
+    if track is None:
+        track = _TRACK
+    _fast_physics.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    engine = SimulationEngine(track, agent_configs, tick_dt, max_laps, rng)
+
+    # Big penalty time for DNF / unfinished unless overwritten below.
+    # Engine agents keep config order, so column i belongs to agent_configs[i].
+    max_time = 2000.0
+    finish_times = np.full(len(agent_configs), max_time, dtype=np.float64)
+    finished = np.zeros(len(agent_configs), dtype=bool)
+
+    # Run until nobody is still racing or timeout
+    while engine.time < max_time:
+        now, statuses, finish_mask = engine.step_array()
+        finish_times[finish_mask & ~finished] = now
+        finished |= finish_mask
+        if np.all(statuses != RACING):
+            break
+
+    return finish_times
+
+
 class MonteCarloSimulator:
     def __init__(
         self,
@@ -14,74 +79,75 @@ class MonteCarloSimulator:
         tick_dt: float = 0.1,
     ):
         self.track_points = base_track_points
+        self.track = track_array(base_track_points)
         self.agent_configs = base_agent_configs
         self.max_laps = max_laps
         self.tick_dt = tick_dt
+        self.id_to_idx = {cfg["id"]: i for i, cfg in enumerate(self.agent_configs)}
 
-    def _run_single_race(self) -> Dict[str, float]:
-        engine = SimulationEngine(
-            self.track_points, self.agent_configs, self.tick_dt, self.max_laps
-        )
-        finish_times: Dict[str, float] = {cfg["id"]: None for cfg in self.agent_configs}
-
-        # Run until all finished or timeout
-        max_time = 2000.0
-        while engine.time < max_time:
-            state = engine.step()
-            all_done = True
-            for agent in state.agents:
-                if finish_times[agent.id] is None and agent.status == "FINISHED":
-                    finish_times[agent.id] = state.time
-                if finish_times[agent.id] is None and agent.status in ("RACING",):
-                    all_done = False
-            if all_done:
-                break
-
-        # Assign big penalty time for DNF / unfinished
-        for aid, t in finish_times.items():
-            if t is None:
-                finish_times[aid] = max_time
-
-        return finish_times
-
-    def run(self, target_agent_id: str, runs: int = 100) -> MonteCarloResult:
-        finish_times_per_run: List[Dict[str, float]] = []
-
-        for i in range(runs):
-            ft = self._run_single_race()
-            finish_times_per_run.append(ft)
+    def _run_races(
+        self,
+        seeds: List[int],
+        pool: Optional[Executor] = None,
+        shared_track: bool = False,
+    ) -> np.ndarray:
+        if len(seeds) < _SERIAL_THRESHOLD:
+            args = (self.track, self.agent_configs, self.tick_dt, self.max_laps)
+            return np.stack([_race_worker(*args, seed) for seed in seeds])
+
+        if pool is not None:
+            track = None if shared_track else self.track
+            args = (track, self.agent_configs, self.tick_dt, self.max_laps)
+            return np.stack(list(pool.map(_race_worker, *map(repeat, args), seeds)))
+
+        # Our own workers get the track once, at startup
+        args = (None, self.agent_configs, self.tick_dt, self.max_laps)
+        with ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=init_worker,
+            initargs=(self.track_points,),
+        ) as own_pool:
+            return np.stack(list(own_pool.map(_race_worker, *map(repeat, args), seeds)))
+
+    def run(
+        self,
+        target_agent_id: str,
+        runs: int = 100,
+        seed: Optional[int] = None,
+        pool: Optional[Executor] = None,
+        shared_track: bool = False,
+    ) -> MonteCarloResult:
+        """
+        Pass a long-lived `pool` (e.g. the API's startup pool) to reuse warm
+        workers; otherwise a pool is created for this call. Set `shared_track`
+        when that pool was started with init_worker(<this track>), so the
+        track isn't sent with every race.
+        """
+        base_seed = seed if seed is not None else random.randrange(2**31)
+        seeds = [base_seed + i for i in range(runs)]
+
+        # times[r, i] = finish time of agent i in run r
+        times = self._run_races(seeds, pool, shared_track)
+        target_idx = self.id_to_idx[target_agent_id]
 
         # Win probability – xi = 1 if agent has min finish time in a run, else 0
-        win_indicators: List[int] = []
-        target_times: List[float] = []
-
-        for ft in finish_times_per_run:
-            # Determine winner
-            winner_id = min(ft, key=lambda k: ft[k])
-            win_indicators.append(1 if winner_id == target_agent_id else 0)
-            target_times.append(ft[target_agent_id])
-
-        x = np.array(win_indicators, dtype=float)
-        t = np.array(target_times, dtype=float)
+        x = (times.argmin(axis=1) == target_idx).astype(np.float64)
+        t = np.take(times, target_idx, axis=1)
         N = len(x)
 
-        # Monte Carlo mean and variance
-        mu_win = x.mean()
-        var_win = ((x - mu_win) ** 2).mean()
-        sigma_win = np.sqrt(var_win)
+        mu_win = float(x.mean())
+        mu_time = float(t.mean())
+
+        if N < 2:
+            # A single run has no spread to estimate; report a zero-width CI
+            margin = margin_time = 0.0
+        else:
+            # 95% CI margins from the normal approximation
+            margin = 1.96 * np.sqrt(x.var(ddof=0) / N)
+            margin_time = 1.96 * np.sqrt(t.var(ddof=0) / N)
 
-        # 95% CI margin for probability
-        se_win = sigma_win / np.sqrt(N)
-        margin = 1.96 * se_win
         ci_low = max(0.0, mu_win - margin)
         ci_high = min(1.0, mu_win + margin)
-
-        # Finish time stats
-        mu_time = t.mean()
-        var_time = ((t - mu_time) ** 2).mean()
-        sigma_time = np.sqrt(var_time)
-        se_time = sigma_time / np.sqrt(N)
-        margin_time = 1.96 * se_time
         ci_time_low = mu_time - margin_time
         ci_time_high = mu_time + margin_time
 
@@ -96,5 +162,5 @@ class MonteCarloSimulator:
             ci_time_high=ci_time_high,
         )
 
-        print(result.formatted())
+        logger.debug("%s", result.formatted())
         return result
@@ -2,10 +2,43 @@
 MonteCarloRunner module: Runs multiple episodes and aggregates statistics.
 """
 
+import os
+import random
+import sys
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
 from simulation.world import World
 from simulation.vehicle import Vehicle
 from simulation.events import EventEngine
 from simulation.engine import SimulationEngine
+from simulation.batch import BatchRace
+
+
+# Below this many episodes, pool startup costs more than it saves
+_SERIAL_THRESHOLD = 8
+
+# Runner each pool worker received once at startup (see _init_worker)
+_WORKER_RUNNER = None
+
+
+def _init_worker(runner):
+    """
+    Pool initializer: keep the runner as a worker global so tasks only
+    carry an episode number, and reseed so forked workers don't replay
+    the parent's random stream.
+    """
+    global _WORKER_RUNNER
+    _WORKER_RUNNER = runner
+    random.seed()
+
+
+def _run_episode(task):
+    """Run one (episode_number, seed_seq) task on this worker's runner."""
+    return _WORKER_RUNNER._run_single_episode(*task)
 
 
 class MonteCarloRunner:
@@ -32,90 +65,200 @@ class MonteCarloRunner:
                   - 'name': display name
                   - 'controller': controller instance
                   - 'vehicle_params': optional dict with max_speed, etc.
+                - 'batch_controller': optional controller driving every
+                  vehicle at once (row i = vehicles[i]), used instead of
+                  the per-vehicle controllers
                 - 'event_config': dict with scheduled and random event configs
                   - 'random_events': dict of probabilities
                   - 'scheduled_events': list of event dicts
         """
         self.scenario = scenario
         self.results = []  # List of race results from all episodes
+        self._cached_aggregate = None  # Output of the last run_many()
+
+        # Scenario settings, read once rather than per episode
+        self._track_radius = scenario.get("track_radius", 100.0)
+        self._dt = scenario.get("dt", 0.05)
+        self._target_laps = scenario.get("target_laps", 3)
+        self._max_time = scenario.get("max_time", 600.0)
+        self._vehicle_configs = scenario.get("vehicles", [])
+        self._event_config = scenario.get("event_config", {})
+        self._batch_controller = scenario.get("batch_controller")
+
+        # Vehicle lookups by id, built once for episodes and print_summary
+        self._vehicle_config_by_id = {
+            vc.get("id"): vc for vc in self._vehicle_configs
+        }
+        self._team_by_id = {
+            vehicle_id: vc.get("team", "")
+            for vehicle_id, vc in self._vehicle_config_by_id.items()
+        }
 
-    def run_many(self, num_episodes=10):
+    def run_many(self, num_episodes=10, num_workers=None, seed=None):
         """
         Run multiple race episodes.
 
+        Episodes are independent, so they run in parallel on a process pool.
+        The scenario (including its controllers) must be picklable.
+
         Args:
             num_episodes: Number of episodes to run
+            num_workers: Worker processes (default: os.cpu_count());
+                1 runs every episode in this process
+            seed: Optional seed; each episode's event and crash streams are
+                spawned from it, so results don't depend on num_workers
+                (controllers draw their own randomness)
 
         Returns:
             Aggregated results dict
         """
         self.results = []
+        self._cached_aggregate = None
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        tasks = list(
+            enumerate(np.random.SeedSequence(seed).spawn(num_episodes))
+        )
 
-        for episode in range(num_episodes):
-            result = self._run_single_episode(episode)
-            self.results.append(result)
-
-        return self._aggregate_results(num_episodes)
-
-    def _run_single_episode(self, episode_number):
+        if num_workers <= 1 or num_episodes < _SERIAL_THRESHOLD:
+            for task in tasks:
+                result = self._run_single_episode(*task)
+                self.results.append(result)
+        else:
+            chunksize = max(1, num_episodes // (4 * num_workers))
+            with Pool(
+                processes=num_workers, initializer=_init_worker, initargs=(self,)
+            ) as pool:
+                for result in pool.imap_unordered(
+                    _run_episode, tasks, chunksize=chunksize
+                ):
+                    self.results.append(result)
+            # Results arrive in completion order; keep them in episode order
+            self.results.sort(key=lambda r: r["episode"])
+
+        self._cached_aggregate = self._aggregate_results(num_episodes)
+        return self._cached_aggregate
+
+    def _run_single_episode(self, episode_number, seed_seq=None):
         """
         Run a single race episode.
 
         Args:
             episode_number: Episode index (0-based)
+            seed_seq: Optional np.random.SeedSequence for this episode's
+                random streams (default: fresh entropy)
 
         Returns:
             Race results dict
         """
+        if seed_seq is None:
+            seed_seq = np.random.SeedSequence()
+        event_seq, engine_seq = seed_seq.spawn(2)
+
         # Create world
-        track_radius = self.scenario.get("track_radius", 100.0)
-        dt = self.scenario.get("dt", 0.05)
-        world = World(track_radius=track_radius, dt=dt)
+        world = World(track_radius=self._track_radius, dt=self._dt)
 
         # Create event engine and configure
-        event_engine = EventEngine()
-        event_config = self.scenario.get("event_config", {})
-
-        if "random_events" in event_config:
-            event_engine.set_random_event_config(event_config["random_events"])
-
-        if "scheduled_events" in event_config:
-            for event_spec in event_config["scheduled_events"]:
-                event_engine.add_scheduled_event(**event_spec)
+        event_engine = self._build_event_engine(np.random.default_rng(event_seq))
 
         # Create vehicles and get controllers
         vehicle_controllers = {}
-        vehicle_configs = self.scenario.get("vehicles", [])
-        vehicle_teams = {}  # Map vehicle_id -> team name
-
-        for vehicle_config in vehicle_configs:
-            vehicle_id = vehicle_config.get("id")
-            name = vehicle_config.get("name", f"Vehicle_{vehicle_id}")
-            team = vehicle_config.get("team", "")
+        for vehicle_config in self._vehicle_configs:
             controller = vehicle_config.get("controller")
-
-            # Optional vehicle parameters
-            vehicle_params = vehicle_config.get("vehicle_params", {})
-            vehicle = Vehicle(vehicle_id, name=name, team=team, **vehicle_params)
-            vehicle_teams[vehicle_id] = team
+            vehicle = self._build_vehicle(vehicle_config)
 
             world.add_vehicle(vehicle)
-            vehicle_controllers[vehicle_id] = controller
+            if controller is not None:  # None when a batch_controller drives
+                vehicle_controllers[vehicle.id] = controller
 
         # Create simulation engine
-        engine = SimulationEngine(world, event_engine, vehicle_controllers)
+        engine = SimulationEngine(
+            world,
+            event_engine,
+            vehicle_controllers,
+            batch_controller=self._batch_controller,
+            rng=np.random.default_rng(engine_seq),
+        )
         engine.set_race_config(
-            target_laps=self.scenario.get("target_laps", 3),
-            max_time=self.scenario.get("max_time", 600.0),
+            target_laps=self._target_laps,
+            max_time=self._max_time,
         )
 
         # Run the race
         results = engine.run_episode()
         results["episode"] = episode_number
-        results["vehicle_teams"] = vehicle_teams
+        results["vehicle_teams"] = dict(self._team_by_id)
 
         return results
 
+    def run_batch(self, num_episodes=10, seed=None, xp=np):
+        """
+        Run every episode at once as a single lockstep BatchRace.
+
+        Each step is one set of (episodes, vehicles) array operations, so
+        this scales with the episode count far better than one engine per
+        episode. Requires the scenario's 'batch_controller' to provide
+        tiled(); results carry no telemetry or per-vehicle event logs.
+
+        Args:
+            num_episodes: Number of episodes to run
+            seed: Optional seed for the batch's random events and crashes
+            xp: Array module for the batch state; pass cupy (not a
+                requirement) to run it on a GPU
+
+        Returns:
+            Aggregated results dict
+        """
+        if self._batch_controller is None:
+            raise ValueError("run_batch() needs a 'batch_controller' in the scenario")
+
+        self.results = []
+        self._cached_aggregate = None
+
+        batch = BatchRace(
+            num_episodes,
+            [self._build_vehicle(vc) for vc in self._vehicle_configs],
+            self._batch_controller.tiled(num_episodes, xp=xp),
+            self._build_event_engine(),
+            track_radius=self._track_radius,
+            dt=self._dt,
+            target_laps=self._target_laps,
+            max_time=self._max_time,
+            rng=xp.random.default_rng(seed),
+            xp=xp,
+        )
+        for episode, results in enumerate(batch.run()):
+            results["episode"] = episode
+            results["vehicle_teams"] = dict(self._team_by_id)
+            self.results.append(results)
+
+        self._cached_aggregate = self._aggregate_results(num_episodes)
+        return self._cached_aggregate
+
+    def _build_event_engine(self, rng=None):
+        """Return an EventEngine configured from the scenario's event_config."""
+        event_engine = EventEngine(rng=rng)
+        event_config = self._event_config
+
+        if "random_events" in event_config:
+            event_engine.set_random_event_config(event_config["random_events"])
+
+        if "scheduled_events" in event_config:
+            for event_spec in event_config["scheduled_events"]:
+                event_engine.add_scheduled_event(**event_spec)
+
+        return event_engine
+
+    def _build_vehicle(self, vehicle_config):
+        """Return a fresh Vehicle for one of the scenario's vehicle configs."""
+        vehicle_id = vehicle_config.get("id")
+        name = vehicle_config.get("name", f"Vehicle_{vehicle_id}")
+        team = self._team_by_id[vehicle_id]
+
+        # Optional vehicle parameters
+        vehicle_params = vehicle_config.get("vehicle_params", {})
+        return Vehicle(vehicle_id, name=name, team=team, **vehicle_params)
+
     def _aggregate_results(self, num_episodes):
         """
         Aggregate results across all episodes.
@@ -147,78 +290,92 @@ class MonteCarloRunner:
             "dnf_reasons": {},  # Aggregate DNF reasons
         }
 
-        # Collect vehicle IDs from all episodes
-        all_vehicle_ids = set()
-        for result in self.results:
-            for finish in result.get("finishing_positions", []):
-                all_vehicle_ids.add(finish["vehicle_id"])
-            for dnf in result.get("dnf_vehicles", []):
-                all_vehicle_ids.add(dnf["vehicle_id"])
-
-        # Compute per-vehicle statistics
-        for vehicle_id in all_vehicle_ids:
-            finish_times = []
-            positions = []
-            lap_counts = []
-            finish_count = 0
-            dnf_count = 0
-            dnf_by_reason = {}
-
-            for result in self.results:
-                # Check if finished (completed race)
-                for finish in result.get("finishing_positions", []):
-                    if finish["vehicle_id"] == vehicle_id:
-                        finish_times.append(finish["finish_time"])
-                        positions.append(finish["position"])
-                        lap_counts.append(finish["lap_count"])
-                        finish_count += 1
-                        break
-                else:
-                    # Check if DNF
-                    for dnf in result.get("dnf_vehicles", []):
-                        if dnf["vehicle_id"] == vehicle_id:
-                            lap_counts.append(dnf["lap_count"])
-                            dnf_count += 1
-                            reason = dnf["dnf_reason"]
-                            dnf_by_reason[reason] = dnf_by_reason.get(reason, 0) + 1
-                            break
+        # One pass over the episodes gathers everything the summaries need
+        finish_records = []
+        dnf_records = []
+        race_times = np.empty(len(self.results), dtype=np.float64)
+        total_events = 0
+        for i, result in enumerate(self.results):
+            finish_records.extend(result.get("finishing_positions", []))
+            dnf_records.extend(result.get("dnf_vehicles", []))
+            race_times[i] = result.get("total_time", 0)
+            total_events += len(result.get("events", []))
+
+        # Tidy tables: one row per finish and one per DNF, across all episodes
+        finishes = pd.DataFrame(
+            finish_records,
+            columns=["vehicle_id", "finish_time", "position", "lap_count"],
+        )
+        dnfs = pd.DataFrame(
+            dnf_records,
+            columns=["vehicle_id", "dnf_reason", "lap_count"],
+        )
+        num_results = len(self.results)
+
+        finish_stats = (
+            finishes.assign(win=finishes["position"] == 1)
+            .groupby("vehicle_id", sort=False)
+            .agg(
+                finish_count=("finish_time", "size"),
+                avg_finish_time=("finish_time", "mean"),
+                min_finish_time=("finish_time", "min"),
+                max_finish_time=("finish_time", "max"),
+                avg_position=("position", "mean"),
+                wins=("win", "sum"),
+            )
+            .to_dict("index")
+        )
+        dnf_counts = dnfs.groupby("vehicle_id", sort=False).size().to_dict()
+        # Reason tallies are small string counts; Counter beats a groupby here
+        dnf_by_reason = defaultdict(dict)
+        for (vehicle_id, reason), count in Counter(
+            (d["vehicle_id"], d["dnf_reason"]) for d in dnf_records
+        ).items():
+            dnf_by_reason[vehicle_id][reason] = count
+
+        # Lap counts come from finishers and DNFs alike
+        avg_lap_counts = (
+            pd.concat(
+                [finishes[["vehicle_id", "lap_count"]], dnfs[["vehicle_id", "lap_count"]]]
+            )
+            .groupby("vehicle_id", sort=False)["lap_count"]
+            .mean()
+            .to_dict()
+        )
+
+        # Compute per-vehicle statistics; the vehicle ids are the scenario's
+        for vehicle_id in self._vehicle_config_by_id:
+            avg_lap_count = avg_lap_counts.get(vehicle_id, 0)
+            v_stats = finish_stats.get(vehicle_id)
+            finish_count = v_stats["finish_count"] if v_stats else 0
+            dnf_count = dnf_counts.get(vehicle_id, 0)
 
             stats["vehicles"][vehicle_id] = {
                 "finish_count": finish_count,
                 "dnf_count": dnf_count,
-                "finish_rate": finish_count / len(self.results),
-                "dnf_rate": dnf_count / len(self.results),
-                "avg_finish_time": sum(finish_times) / len(finish_times)
-                if finish_times
-                else None,
-                "min_finish_time": min(finish_times) if finish_times else None,
-                "max_finish_time": max(finish_times) if finish_times else None,
-                "avg_position": sum(positions) / len(positions) if positions else None,
-                "avg_lap_count": sum(lap_counts) / len(lap_counts)
-                if lap_counts
-                else 0,
-                "wins": sum(1 for p in positions if p == 1),
-                "dnf_reasons": dnf_by_reason,
+                "finish_rate": finish_count / num_results,
+                "dnf_rate": dnf_count / num_results,
+                "avg_finish_time": v_stats["avg_finish_time"] if v_stats else None,
+                "min_finish_time": v_stats["min_finish_time"] if v_stats else None,
+                "max_finish_time": v_stats["max_finish_time"] if v_stats else None,
+                "avg_position": v_stats["avg_position"] if v_stats else None,
+                "avg_lap_count": float(avg_lap_count),
+                "wins": v_stats["wins"] if v_stats else 0,
+                "dnf_reasons": dnf_by_reason.get(vehicle_id, {}),
             }
 
         # Aggregate DNF reasons across all episodes
-        for result in self.results:
-            for dnf in result.get("dnf_vehicles", []):
-                reason = dnf["dnf_reason"]
-                stats["dnf_reasons"][reason] = stats["dnf_reasons"].get(reason, 0) + 1
+        stats["dnf_reasons"] = dict(Counter(d["dnf_reason"] for d in dnf_records))
 
         # Compute overall statistics
-        total_time_values = [r.get("total_time", 0) for r in self.results]
-        total_dnf = sum(len(r.get("dnf_vehicles", [])) for r in self.results)
-        total_finishes = sum(
-            len(r.get("finishing_positions", [])) for r in self.results
-        )
+        total_dnf = len(dnfs)
+        total_finishes = len(finishes)
 
         stats["overall"] = {
-            "avg_race_time": sum(total_time_values) / len(total_time_values),
-            "min_race_time": min(total_time_values),
-            "max_race_time": max(total_time_values),
-            "total_events": sum(len(r.get("events", [])) for r in self.results),
+            "avg_race_time": float(race_times.mean()),
+            "min_race_time": float(race_times.min()),
+            "max_race_time": float(race_times.max()),
+            "total_events": total_events,
             "total_finishes": total_finishes,
             "total_dnf": total_dnf,
             "dnf_rate": total_dnf / (total_finishes + total_dnf)
@@ -238,29 +395,27 @@ class MonteCarloRunner:
             print("No results to display. Run run_many() first.")
             return
 
-        aggregated = self._aggregate_results(len(self.results))
+        aggregated = self._cached_aggregate
+        if aggregated is None:
+            aggregated = self._aggregate_results(len(self.results))
         stats = aggregated["statistics"]
 
         # Build team statistics from vehicle stats
-        team_stats = {}
+        team_stats = defaultdict(
+            lambda: {
+                "vehicles": [],
+                "combined_finish_count": 0,
+                "combined_dnf_count": 0,
+                "avg_finish_time": [],
+                "positions": [],
+                "wins": 0,
+            }
+        )
         for vehicle_id, v_stats in stats["vehicles"].items():
             # Find team from scenario
-            team_name = None
-            for vehicle_config in self.scenario.get("vehicles", []):
-                if vehicle_config.get("id") == vehicle_id:
-                    team_name = vehicle_config.get("team", "Unknown")
-                    break
-            
-            if team_name and team_name not in team_stats:
-                team_stats[team_name] = {
-                    "vehicles": [],
-                    "combined_finish_count": 0,
-                    "combined_dnf_count": 0,
-                    "avg_finish_time": [],
-                    "positions": [],
-                    "wins": 0,
-                }
-            
+            vehicle_config = self._vehicle_config_by_id.get(vehicle_id)
+            team_name = vehicle_config.get("team", "Unknown") if vehicle_config else None
+
             if team_name:
                 team_stats[team_name]["vehicles"].append(vehicle_id)
                 team_stats[team_name]["combined_finish_count"] += v_stats["finish_count"]
@@ -269,15 +424,17 @@ class MonteCarloRunner:
                     team_stats[team_name]["avg_finish_time"].append(v_stats["avg_finish_time"])
                 team_stats[team_name]["wins"] += v_stats["wins"]
 
-        print("=" * 80)
-        print("MONTE CARLO SIMULATION RESULTS")
-        print("=" * 80)
-        print(f"Episodes run: {aggregated['num_episodes']}")
-        print()
+        # Collect the report and write it in one go rather than per line
+        lines = []
+        lines.append("=" * 80)
+        lines.append("MONTE CARLO SIMULATION RESULTS")
+        lines.append("=" * 80)
+        lines.append(f"Episodes run: {aggregated['num_episodes']}")
+        lines.append("")
 
         # Print team statistics first
-        print("TEAM STATISTICS (pairs of drivers):")
-        print("-" * 80)
+        lines.append("TEAM STATISTICS (pairs of drivers):")
+        lines.append("-" * 80)
         for team_name in sorted(team_stats.keys()):
             t_stats = team_stats[team_name]
             avg_time = sum(t_stats["avg_finish_time"]) / len(t_stats["avg_finish_time"]) if t_stats["avg_finish_time"] else None
@@ -285,61 +442,59 @@ class MonteCarloRunner:
             dnf_count = t_stats["combined_dnf_count"]
             finish_rate = finish_count / (finish_count + dnf_count) if (finish_count + dnf_count) > 0 else 0
             
-            print(f"\n{team_name}:")
-            print(f"  Drivers: {t_stats['vehicles']}")
-            print(f"  Combined Finishes: {finish_count}, DNF: {dnf_count}")
-            print(f"  Finish Rate: {finish_rate:.1%}")
+            lines.append(f"\n{team_name}:")
+            lines.append(f"  Drivers: {t_stats['vehicles']}")
+            lines.append(f"  Combined Finishes: {finish_count}, DNF: {dnf_count}")
+            lines.append(f"  Finish Rate: {finish_rate:.1%}")
             if avg_time:
-                print(f"  Avg Finish Time: {avg_time:.2f}s")
-            print(f"  Team Wins: {t_stats['wins']}")
+                lines.append(f"  Avg Finish Time: {avg_time:.2f}s")
+            lines.append(f"  Team Wins: {t_stats['wins']}")
 
-        print()
-        print("INDIVIDUAL DRIVER STATISTICS:")
-        print("-" * 80)
+        lines.append("")
+        lines.append("INDIVIDUAL DRIVER STATISTICS:")
+        lines.append("-" * 80)
         for vehicle_id in sorted(stats["vehicles"].keys()):
             vehicle_stats = stats["vehicles"][vehicle_id]
             # Find vehicle name
-            vehicle_name = f"Vehicle {vehicle_id}"
-            for vehicle_config in self.scenario.get("vehicles", []):
-                if vehicle_config.get("id") == vehicle_id:
-                    vehicle_name = vehicle_config.get("name", f"Vehicle {vehicle_id}")
-                    break
-            
-            print(f"\n{vehicle_name}:")
-            print(f"  Finish Rate: {vehicle_stats['finish_rate']:.1%}")
-            print(f"  DNF Rate: {vehicle_stats['dnf_rate']:.1%}")
+            vehicle_config = self._vehicle_config_by_id.get(vehicle_id, {})
+            vehicle_name = vehicle_config.get("name", f"Vehicle {vehicle_id}")
+
+            lines.append(f"\n{vehicle_name}:")
+            lines.append(f"  Finish Rate: {vehicle_stats['finish_rate']:.1%}")
+            lines.append(f"  DNF Rate: {vehicle_stats['dnf_rate']:.1%}")
             if vehicle_stats['dnf_reasons']:
-                print(f"  DNF Reasons: {vehicle_stats['dnf_reasons']}")
+                lines.append(f"  DNF Reasons: {vehicle_stats['dnf_reasons']}")
             if vehicle_stats['avg_finish_time'] is not None:
-                print(f"  Avg Finish Time: {vehicle_stats['avg_finish_time']:.2f}s")
+                lines.append(f"  Avg Finish Time: {vehicle_stats['avg_finish_time']:.2f}s")
             if vehicle_stats['avg_position'] is not None:
-                print(f"  Avg Position: {vehicle_stats['avg_position']:.2f}")
-            print(f"  Wins: {vehicle_stats['wins']}")
-            print(f"  Avg Lap Count: {vehicle_stats['avg_lap_count']:.2f}")
+                lines.append(f"  Avg Position: {vehicle_stats['avg_position']:.2f}")
+            lines.append(f"  Wins: {vehicle_stats['wins']}")
+            lines.append(f"  Avg Lap Count: {vehicle_stats['avg_lap_count']:.2f}")
 
-        print()
-        print("OVERALL STATISTICS:")
-        print("-" * 80)
+        lines.append("")
+        lines.append("OVERALL STATISTICS:")
+        lines.append("-" * 80)
         overall = stats["overall"]
-        print(f"Total Finishes: {overall['total_finishes']}")
-        print(f"Total DNF: {overall['total_dnf']}")
-        print(f"Overall DNF Rate: {overall['dnf_rate']:.1%}")
-        print(f"Avg Race Time: {overall['avg_race_time']:.2f}s")
-        print(f"Min Race Time: {overall['min_race_time']:.2f}s")
-        print(f"Max Race Time: {overall['max_race_time']:.2f}s")
-        print(f"Total Events Fired: {overall['total_events']}")
+        lines.append(f"Total Finishes: {overall['total_finishes']}")
+        lines.append(f"Total DNF: {overall['total_dnf']}")
+        lines.append(f"Overall DNF Rate: {overall['dnf_rate']:.1%}")
+        lines.append(f"Avg Race Time: {overall['avg_race_time']:.2f}s")
+        lines.append(f"Min Race Time: {overall['min_race_time']:.2f}s")
+        lines.append(f"Max Race Time: {overall['max_race_time']:.2f}s")
+        lines.append(f"Total Events Fired: {overall['total_events']}")
 
         if stats["dnf_reasons"]:
-            print()
-            print("DNF REASONS BREAKDOWN:")
-            print("-" * 80)
+            lines.append("")
+            lines.append("DNF REASONS BREAKDOWN:")
+            lines.append("-" * 80)
             for reason, count in sorted(
                 stats["dnf_reasons"].items(), key=lambda x: x[1], reverse=True
             ):
                 percentage = (count / overall['total_dnf'] * 100) if overall['total_dnf'] > 0 else 0
-                print(f"  {reason}: {count} ({percentage:.1f}%)")
+                lines.append(f"  {reason}: {count} ({percentage:.1f}%)")
 
-        print("=" * 80)
+        lines.append("=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def __repr__(self):
         return f"MonteCarloRunner(episodes={len(self.results)})"
@@ -0,0 +1,400 @@
+"""
+Batch module: Defines BatchRace, which steps many independent races at once.
+"""
+
+import math
+
+import numpy as np
+
+from simulation.track import Track
+from simulation.vehicle import DNF_NONE, DNF_REASONS, STEER_FACTOR
+
+
+# Codes in BatchRace.dnf_reason index into DNF_REASONS
+_DNF_CODE = {reason: code for code, reason in enumerate(DNF_REASONS)}
+
+
+class BatchRace:
+    """
+    K independent races of the same grid, advanced in lockstep.
+
+    Every piece of per-vehicle state is a (K, N) array (trial, vehicle) and
+    each step is a fixed handful of array operations, whatever K is. The
+    race rules follow SimulationEngine.step: events, failure timers,
+    controller, physics, lap progress, finish / crash / engine DNF.
+
+    Only results are kept: there is no telemetry and no per-vehicle event
+    log. The controller must decide for flat rows (row k * N + i = vehicle
+    i of trial k), e.g. BatchedDriverStyleController.tiled(K).
+    """
+
+    def __init__(
+        self,
+        num_trials,
+        vehicles,
+        controller,
+        event_engine,
+        track_radius=100.0,
+        dt=0.05,
+        target_laps=3,
+        max_time=600.0,
+        rng=None,
+        xp=np,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            num_trials: Number of races K
+            vehicles: List of N Vehicle instances (ids, names and limits)
+            controller: Batch controller with get_actions(state, rows) over
+                K * N flat rows
+            event_engine: EventEngine supplying the random event config and
+                scheduled events (its own state is not used)
+            track_radius: Radius of the circular track
+            dt: Simulation timestep
+            target_laps: Number of laps required to finish
+            max_time: Maximum race duration in seconds
+            rng: Optional Generator from `xp` (default: a freshly seeded one)
+            xp: Array module, numpy or a NumPy-compatible one such as cupy
+                to run the batch on a GPU (the controller must match; see
+                BatchedDriverStyleController.tiled)
+        """
+        self.xp = xp
+        self._rng = rng if rng is not None else xp.random.default_rng()
+        self.num_trials = num_trials
+        self.vehicles = list(vehicles)
+        self.controller = controller
+        self.track = Track(radius=track_radius)
+        self.dt = dt
+        self.target_laps = target_laps
+        self.max_time = max_time
+
+        self.random_event_config = (
+            event_engine.random_event_config or event_engine.default_random_config
+        )
+        self.scheduled_events = sorted(
+            event_engine.scheduled_events, key=lambda event: event.time
+        )
+        self._column = {vehicle.id: i for i, vehicle in enumerate(self.vehicles)}
+
+        # Per-vehicle limits broadcast over the trial axis
+        self._max_speed = xp.array(
+            [v.max_speed for v in self.vehicles], dtype=np.float64
+        )
+        self._max_acceleration = xp.array(
+            [v.max_acceleration for v in self.vehicles], dtype=np.float64
+        )
+        self._max_deceleration = xp.array(
+            [v.max_deceleration for v in self.vehicles], dtype=np.float64
+        )
+
+        self.reset()
+
+    def reset(self):
+        """Put every trial on the starting line for a new batch."""
+        xp = self.xp
+        shape = (self.num_trials, len(self.vehicles))
+        start_x, start_y = self.track.get_centerline_point(0.0)
+
+        # state[name].reshape(-1) are the flat rows the controller sees
+        self.state = {
+            "x": xp.full(shape, start_x),
+            "y": xp.full(shape, start_y),
+            "speed": xp.zeros(shape),
+            "heading": xp.zeros(shape),
+            "lap_progress": xp.zeros(shape),
+            "lap_count": xp.zeros(shape, dtype=np.int64),
+            "is_finished": xp.zeros(shape, dtype=bool),
+            "is_engine_failed": xp.zeros(shape, dtype=bool),
+            "is_control_impaired": xp.zeros(shape, dtype=bool),
+        }
+        self._flat_state = {name: col.reshape(-1) for name, col in self.state.items()}
+        self.failure_recovery_time = xp.zeros(shape)
+        self.cumulative_engine_failure_time = xp.zeros(shape)
+
+        self.finish_time = xp.full(shape, np.nan)
+        self.finish_position = xp.zeros(shape, dtype=np.int64)  # 0 = none
+        self.dnf_reason = xp.full(shape, DNF_NONE, dtype=np.int8)
+        self._finished_count = xp.zeros(self.num_trials, dtype=np.int64)
+
+        self.is_raining = xp.zeros(self.num_trials, dtype=bool)
+        self.time_elapsed = 0.0
+        self.total_time = xp.full(self.num_trials, np.nan)  # when each race ended
+        self.events_fired = [[] for _ in range(self.num_trials)]
+        self._next_scheduled = 0
+
+        self.controller.reset()
+
+    def is_finished(self):
+        """True once every trial is over (see SimulationEngine.is_race_finished)."""
+        if self.time_elapsed >= self.max_time:
+            return True
+        return bool(self.state["is_finished"].all())
+
+    def step(self):
+        """Execute one simulation timestep in every trial."""
+        xp = self.xp
+        dt = self.dt
+        now = self.time_elapsed
+        state = self.state
+        racing = ~state["is_finished"]
+        live = racing.any(axis=1)  # trials still running
+
+        self._fire_scheduled_events(now, live)
+        self._generate_random_events(now, live, racing)
+
+        # Failure timers (Vehicle.update_failures): flags as they stand at the
+        # start of the step decide this step's throttle cut / steering
+        engine_failed = state["is_engine_failed"] & racing
+        impaired = state["is_control_impaired"] & racing
+        recovery = self.failure_recovery_time
+        self.cumulative_engine_failure_time[engine_failed] += dt
+        recovery[engine_failed] -= dt
+        state["is_engine_failed"][engine_failed & (recovery <= 0)] = False
+        recovery[impaired] -= dt
+        state["is_control_impaired"][impaired & (recovery <= 0)] = False
+
+        # Controller decides for every racing row at once
+        rows = racing.reshape(-1).nonzero()[0]
+        throttle = xp.zeros(racing.shape)
+        brake = xp.zeros(racing.shape)
+        steer = xp.zeros(racing.shape)
+        (
+            throttle.reshape(-1)[rows],
+            brake.reshape(-1)[rows],
+            steer.reshape(-1)[rows],
+        ) = self.controller.get_actions(self._flat_state, rows)
+
+        # Failed engines give no throttle; impaired steering is halved
+        throttle[engine_failed] = 0.0
+        steer = xp.clip(steer, -1.0, 1.0)
+        steer[impaired] *= 0.5
+
+        self._step_physics(racing, throttle, brake, steer)
+
+        # Lap progress (track.progress_step over both axes)
+        lap_distance = self.track.get_lap_distance()
+        new_progress = (
+            xp.arctan2(state["y"], state["x"]) % math.tau
+        ) * self.track.radius % lap_distance
+        lap_done = (
+            racing
+            & (state["lap_progress"] >= 0.9 * lap_distance)
+            & (new_progress < 0.1 * lap_distance)
+        )
+        state["lap_count"] += lap_done
+        xp.copyto(state["lap_progress"], new_progress, where=racing)
+
+        # Finish, crash and catastrophic engine failure, in that priority
+        finished = racing & (state["lap_count"] >= self.target_laps)
+        crashed = (
+            racing
+            & ~finished
+            & state["is_control_impaired"]
+            & (self._rng.random(racing.shape) < 0.003)
+        )
+        engine_dnf = (
+            racing & ~finished & ~crashed & (self.cumulative_engine_failure_time > 15.0)
+        )
+        if now >= self.max_time:
+            timed_out = racing & ~finished & ~crashed & ~engine_dnf
+        else:
+            timed_out = None
+        self._retire(now, finished, crashed, engine_dnf, timed_out)
+
+        # Advance time; trials that just ended stop the clock here
+        self.time_elapsed += dt
+        ended = live & state["is_finished"].all(axis=1)
+        self.total_time[ended] = self.time_elapsed
+
+    def _step_physics(self, racing, throttle, brake, steer):
+        """Vehicle physics (see vehicle.vehicle_physics) for racing entries."""
+        xp = self.xp
+        state = self.state
+        dt = self.dt
+        friction_mult = xp.where(self.is_raining, 1.5, 1.0)[:, None]
+        weather_effect = xp.where(self.is_raining, 0.8, 1.0)[:, None]
+
+        thr = xp.clip(throttle, 0.0, 1.0)
+        brk = xp.clip(brake, 0.0, 1.0)
+        speed = state["speed"]
+
+        net_acceleration = thr * self._max_acceleration - brk * self._max_deceleration
+        net_acceleration -= xp.where(speed > 0, 0.5 * friction_mult, 0.0)
+        speed = xp.clip(
+            speed + net_acceleration * dt, 0.0, self._max_speed * weather_effect
+        )
+        heading = state["heading"] + steer * speed * STEER_FACTOR * dt
+
+        xp.copyto(state["x"], state["x"] + speed * xp.cos(heading) * dt, where=racing)
+        xp.copyto(state["y"], state["y"] + speed * xp.sin(heading) * dt, where=racing)
+        xp.copyto(state["speed"], speed, where=racing)
+        xp.copyto(state["heading"], heading, where=racing)
+
+    def _retire(self, now, finished, crashed, engine_dnf, timed_out):
+        """Record this step's finishes and DNFs."""
+        xp = self.xp
+        retired = finished | crashed | engine_dnf
+        if finished.any():
+            # Positions count earlier retirements in vehicle order, as the
+            # engine's per-vehicle loop does (DNFs included)
+            order = self._finished_count[:, None] + xp.cumsum(retired, axis=1)
+            self.finish_position[finished] = order[finished]
+        if timed_out is not None:
+            retired |= timed_out  # the engine times vehicles out after its loop
+        if not retired.any():
+            return
+        self._finished_count += retired.sum(axis=1)
+
+        self.dnf_reason[crashed] = _DNF_CODE["CRASH"]
+        self.dnf_reason[engine_dnf] = _DNF_CODE["ENGINE_FAILURE"]
+        if timed_out is not None:
+            self.dnf_reason[timed_out] = _DNF_CODE["TIMEOUT"]
+        self.finish_time[retired] = now
+        self.state["is_finished"] |= retired
+
+    def _fire_scheduled_events(self, now, live):
+        """Fire due scheduled events in every live trial."""
+        xp = self.xp
+        events = self.scheduled_events
+        while (
+            self._next_scheduled < len(events)
+            and events[self._next_scheduled].time <= now + 1e-6
+        ):
+            event = events[self._next_scheduled]
+            self._next_scheduled += 1
+
+            if event.type in ("RAIN_ON", "RAIN_OFF"):
+                self.is_raining[live] = event.type == "RAIN_ON"
+            elif event.type in ("ENGINE_FAILURE", "CONTROL_IMPAIRMENT"):
+                column = self._column.get(event.params.get("vehicle_id"))
+                if column is not None:
+                    default = 5.0 if event.type == "ENGINE_FAILURE" else 3.0
+                    target = xp.zeros(self.state["x"].shape, dtype=bool)
+                    target[live, column] = True
+                    self._apply_failure(
+                        event.type, target, event.params.get("duration", default)
+                    )
+
+            for k in live.nonzero()[0].tolist():
+                self.events_fired[k].append(
+                    {"type": event.type, "time": now, "params": event.params}
+                )
+
+    def _generate_random_events(self, now, live, racing):
+        """Random rain and vehicle failures (see EventEngine.generate_random_events)."""
+        config = self.random_event_config
+        weather_draws = self._rng.random((self.num_trials, 2))
+
+        rain_on = live & (weather_draws[:, 0] < config.get("rain_on_prob", 0.0))
+        self.is_raining[rain_on] = True
+        rain_off = live & (weather_draws[:, 1] < config.get("rain_off_prob", 0.0))
+        self.is_raining[rain_off] = False
+
+        engine_hits = racing & (
+            self._rng.random(racing.shape) < config.get("engine_failure_prob", 0.0)
+        )
+        impair_hits = racing & (
+            self._rng.random(racing.shape) < config.get("control_impairment_prob", 0.0)
+        )
+        if engine_hits.any():
+            durations = self._rng.uniform(2.0, 5.0, racing.shape)
+            self._apply_failure("ENGINE_FAILURE", engine_hits, durations[engine_hits])
+        if impair_hits.any():
+            durations = self._rng.uniform(1.0, 3.0, racing.shape)
+            self._apply_failure(
+                "CONTROL_IMPAIRMENT", impair_hits, durations[impair_hits]
+            )
+
+        # Event history; these are rare, so a Python loop is fine
+        for k in (rain_on | rain_off).nonzero()[0].tolist():
+            for event_type, hit in (("RAIN_ON", rain_on[k]), ("RAIN_OFF", rain_off[k])):
+                if hit:
+                    self.events_fired[k].append(
+                        {"type": event_type, "time": now, "vehicle_id": None}
+                    )
+        for event_type, hits in (
+            ("ENGINE_FAILURE", engine_hits),
+            ("CONTROL_IMPAIRMENT", impair_hits),
+        ):
+            for k, i in zip(*(index.tolist() for index in hits.nonzero())):
+                self.events_fired[k].append(
+                    {"type": event_type, "time": now, "vehicle_id": self.vehicles[i].id}
+                )
+
+    def _apply_failure(self, event_type, target, duration):
+        """Vehicle.apply_engine_failure / apply_control_impairment over a mask."""
+        xp = self.xp
+        flag = "is_engine_failed" if event_type == "ENGINE_FAILURE" else "is_control_impaired"
+        column = self.state[flag]
+        duration = xp.broadcast_to(duration, (int(target.sum()),))
+        fresh = ~column[target]  # an ongoing failure is not restarted
+        hit = target.copy()
+        hit[target] = fresh
+        column[hit] = True
+        self.failure_recovery_time[hit] = duration[fresh]
+
+    def run(self):
+        """
+        Run every trial to completion.
+
+        Returns:
+            List of K race results dicts, shaped like
+            SimulationEngine.get_race_results() minus telemetry and event logs
+        """
+        self.reset()
+        while not self.is_finished():
+            self.step()
+        # Trials cut off by max_time end when the batch does
+        self.total_time[self.xp.isnan(self.total_time)] = self.time_elapsed
+        return [self._trial_results(k) for k in range(self.num_trials)]
+
+    def _trial_results(self, k):
+        """Race results dict for trial k."""
+        lap_count = self.state["lap_count"][k].tolist()
+        lap_progress = self.state["lap_progress"][k].tolist()
+        finish_time = self.finish_time[k].tolist()
+        position = self.finish_position[k].tolist()
+        dnf_reason = self.dnf_reason[k].tolist()
+
+        finishing_positions = []
+        dnf_vehicles = []
+        retired = [i for i in range(len(self.vehicles)) if not math.isnan(finish_time[i])]
+        for i in sorted(retired, key=lambda i: finish_time[i]):
+            vehicle = self.vehicles[i]
+            if position[i]:
+                finishing_positions.append(
+                    {
+                        "position": position[i],
+                        "vehicle_id": vehicle.id,
+                        "vehicle_name": vehicle.name,
+                        "finish_time": finish_time[i],
+                        "lap_count": lap_count[i],
+                    }
+                )
+            elif dnf_reason[i] != DNF_NONE:
+                dnf_vehicles.append(
+                    {
+                        "vehicle_id": vehicle.id,
+                        "vehicle_name": vehicle.name,
+                        "dnf_reason": DNF_REASONS[dnf_reason[i]],
+                        "dnf_time": finish_time[i],
+                        "lap_count": lap_count[i],
+                        "lap_progress": lap_progress[i],
+                    }
+                )
+
+        return {
+            "total_time": float(self.total_time[k]),
+            "target_laps": self.target_laps,
+            "finishing_positions": finishing_positions,
+            "dnf_vehicles": dnf_vehicles,
+            "events": self.events_fired[k],
+        }
+
+    def __repr__(self):
+        return (
+            f"BatchRace(trials={self.num_trials}, vehicles={len(self.vehicles)}, "
+            f"target_laps={self.target_laps}, max_time={self.max_time})"
+        )
@@ -14,6 +14,7 @@ class BaseController:
     def get_action(self, obs):
         """
         Core control method.
+        `obs` is the vehicle's Observation namedtuple (see Vehicle.get_state).
         Must return a tuple:
             (throttle: 0-1, brake: 0-1, steering: -1 to 1)
         """
@@ -1,8 +1,10 @@
-import json
-import random
+import copy
 import math
 from pathlib import Path
-from simulation.controllers import BaseController
+from types import MappingProxyType
+import numpy as np
+import orjson
+from .base_controllers import BaseController
 
 
 PROFILE_PATH = (
@@ -11,31 +13,75 @@ PROFILE_PATH = (
     / "driver_profiles.json"
 )
 
+_PROFILES = None
+
+# Steering jitter values drawn per Generator call (see DriverStyleController)
+_JITTER_BLOCK = 1024
+
+
+def load_driver_profiles():
+    """Parse driver_profiles.json once per process and return a read-only view."""
+    global _PROFILES
+    if _PROFILES is None:
+        _PROFILES = MappingProxyType(orjson.loads(PROFILE_PATH.read_bytes()))
+    return _PROFILES
+
 
 class DriverStyleController(BaseController):
     """AI Controller that behaves based on real driver style + dynamic conditions."""
 
-    def __init__(self, driver_code: str, track_radius=100.0):
+    def __init__(self, driver_code: str, track_radius=100.0, profile=None, seed=None):
         super().__init__(name=f"DriverStyle-{driver_code}")
         self.driver_code = driver_code
         self.track_radius = track_radius
 
-        self.profile = self._load_profile()
+        self.profile = profile if profile is not None else self._load_profile()
 
-        # base values from FastF1 stats
+        # base values from FastF1 stats, flattened to floats so the per-tick
+        # code never goes back to the profile dict
+        overall = self.profile["overall"]
         self.base_speed = self._map_target_speed()
-        self.aggression = self.profile["overall"]["aggression_score"]
-        self.brake_bias = self.profile["overall"]["braking_risk"]
-        self.coast_bias = self.profile["overall"]["coasting_pct"]
+        self._base_aggression = float(overall["aggression_score"])
+        self.aggression = self._base_aggression
+        self.brake_bias = float(overall["braking_risk"])
+        self.coast_bias = float(overall["coasting_pct"])
 
         # dynamic game state values
         self.tire_wear = 0.0
         self.confidence = 1.0     # drop on crashes / events
         self.fuel_penalty = 1.0   # high early, drops later
+        self._last_lap_count = -1  # lap the tire/fuel values were computed for
+
+        # steering jitter, pre-drawn in blocks from a numpy Generator
+        self._seed = seed
+        self._rng = None  # created on first use; see __getstate__
+        self._jitter = []
+        self._jitter_idx = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._seed is None:
+            # Unseeded: each process that unpickles us (e.g. a pool worker)
+            # draws its own jitter stream instead of replaying ours
+            state["_rng"] = None
+            state["_jitter"] = []
+            state["_jitter_idx"] = 0
+        return state
+
+    def reset(self):
+        """
+        Start a new race: tire, fuel, aggression and confidence go back to
+        their starting values. The jitter stream carries on, so a seeded
+        controller still drives each race differently.
+        """
+        self.aggression = self._base_aggression
+        self.tire_wear = 0.0
+        self.confidence = 1.0
+        self.fuel_penalty = 1.0
+        self._last_lap_count = -1
 
     def _load_profile(self):
-        with open(PROFILE_PATH, "r") as f:
-            return json.load(f)[self.driver_code]
+        return load_driver_profiles()[self.driver_code]
 
     def _map_target_speed(self):
         max_kmh = self.profile["overall"]["max_speed"]
@@ -44,20 +90,23 @@ class DriverStyleController(BaseController):
     # ------------ DYNAMIC ADAPTATION ---------------
     def _update_state(self, obs):
         """Modify driving characteristics over time / conditions."""
-        lap_progress = obs.get("lap_progress", 0)
-        lap_count = obs.get("lap_count", 1)
+        lap_count = obs.lap_count
 
-        # Tire degradation increases linearly per lap
-        self.tire_wear = min(1.0, lap_count * 0.12)
+        # Tire, aggression and fuel values only depend on the lap
+        if lap_count != self._last_lap_count:
+            self._last_lap_count = lap_count
 
-        # Reduce willingness to take risks with worn tires
-        self.aggression = max(0.4, self.profile["overall"]["aggression_score"] - (self.tire_wear * 0.25))
+            # Tire degradation increases linearly per lap
+            self.tire_wear = min(1.0, lap_count * 0.12)
 
-        # Fuel load decreases → slight pace boost
-        self.fuel_penalty = max(0.7, 1 - (lap_count * 0.05))
+            # Reduce willingness to take risks with worn tires
+            self.aggression = max(0.4, self._base_aggression - (self.tire_wear * 0.25))
+
+            # Fuel load decreases → slight pace boost
+            self.fuel_penalty = max(0.7, 1 - (lap_count * 0.05))
 
         # Confidence dynamics: more speed → stabilizes handling
-        if obs.get("speed", 0) > self.base_speed * 0.9:
+        if obs.speed > self.base_speed * 0.9:
             self.confidence = min(1.2, self.confidence + 0.01)
         else:
             self.confidence = max(0.8, self.confidence - 0.002)
@@ -66,35 +115,182 @@ class DriverStyleController(BaseController):
     def get_action(self, obs):
         self._update_state(obs)
 
-        x, y = obs.get("x", 0), obs.get("y", 0)
-        speed = obs.get("speed", 0)
+        # locals: read each attribute once per tick
+        aggression = self.aggression
+        brake_bias = self.brake_bias
+        tire_wear = self.tire_wear
+        confidence = self.confidence
+        track_radius = self.track_radius
+
+        x, y = obs.x, obs.y
+        speed = obs.speed
 
         # SPEED TARGET CHANGES WITH RACE CONDITIONS
-        dynamic_speed_target = self.base_speed * self.fuel_penalty * self.confidence
+        dynamic_speed_target = self.base_speed * self.fuel_penalty * confidence
 
         # SPEED CONTROL
         if speed < dynamic_speed_target:
-            throttle = min(1.0, self.aggression + 0.15)
+            throttle = min(1.0, aggression + 0.15)
             brake = 0.0
         else:
-            throttle = max(0, (1 - self.brake_bias) * self.confidence)
-            brake = min(1.0, self.brake_bias + self.tire_wear * 0.3)
+            throttle = max(0, (1 - brake_bias) * confidence)
+            brake = min(1.0, brake_bias + tire_wear * 0.3)
 
         # STEERING CONTROL W/ REAL DRIVER VARIANCE
-        dist = math.sqrt(x**2 + y**2)
-        steer_err = (dist - self.track_radius)
+        dist = math.hypot(x, y)
+        steer_err = (dist - track_radius)
 
         steer = (
-            -steer_err / self.track_radius
-            * (0.15 + self.aggression * 0.25)
-            * (1 - self.tire_wear * 0.3)
+            -steer_err / track_radius
+            * (0.15 + aggression * 0.25)
+            * (1 - tire_wear * 0.3)
         )
 
         # Realistic driver "jitter"
-        steer += random.uniform(-0.02, 0.02) * (0.5 + self.coast_bias)
+        i = self._jitter_idx
+        if i == len(self._jitter):
+            if self._rng is None:
+                self._rng = np.random.default_rng(self._seed)
+            self._jitter = self._rng.uniform(-0.02, 0.02, _JITTER_BLOCK).tolist()
+            i = 0
+        self._jitter_idx = i + 1
+        steer += self._jitter[i] * (0.5 + self.coast_bias)
 
         return (
             round(throttle, 3),
             round(brake, 3),
             max(-1, min(1, round(steer, 3)))
         )
+
+
+class BatchedDriverStyleController:
+    """
+    DriverStyleController logic for a whole grid in one vectorized call.
+
+    Row i of the World's state columns is driven by driver_codes[i]; pass it
+    to SimulationEngine as `batch_controller` in place of per-vehicle
+    controllers.
+    """
+
+    def __init__(self, driver_codes, track_radius=100.0, profiles=None, seed=None):
+        self.name = "BatchedDriverStyle"
+        self.driver_codes = list(driver_codes)
+        self.track_radius = track_radius
+
+        if profiles is None:
+            profiles = load_driver_profiles()
+        overall = [profiles[code]["overall"] for code in self.driver_codes]
+
+        # per-driver constants, stacked so a tick is a handful of array ops
+        self.base_speed = np.array([min(o["max_speed"] / 8, 60) for o in overall], dtype=np.float64)
+        self._base_aggression = np.array([o["aggression_score"] for o in overall], dtype=np.float64)
+        self.aggression = self._base_aggression.copy()
+        self.brake_bias = np.array([o["braking_risk"] for o in overall], dtype=np.float64)
+        self.coast_bias = np.array([o["coasting_pct"] for o in overall], dtype=np.float64)
+
+        # dynamic game state values
+        n = len(self.driver_codes)
+        self.tire_wear = np.zeros(n)
+        self.confidence = np.ones(n)
+        self.fuel_penalty = np.ones(n)
+
+        self._seed = seed
+        self._rng = None  # created on first use; see __getstate__
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._seed is None:
+            # Unseeded: each process that unpickles us (e.g. a pool worker)
+            # draws its own jitter stream instead of replaying ours
+            state["_rng"] = None
+        return state
+
+    def reset(self):
+        """Start a new race, as DriverStyleController.reset does for each row."""
+        self.aggression[...] = self._base_aggression
+        self.tire_wear[...] = 0.0
+        self.confidence[...] = 1.0
+        self.fuel_penalty[...] = 1.0
+
+    def tiled(self, copies, xp=np):
+        """
+        Return a controller for `copies` stacked grids, e.g. the trials of a
+        BatchRace: row k * N + i is driver i of copy k. Its arrays and jitter
+        Generator come from the array module `xp` (numpy, or e.g. cupy).
+        """
+        tiled = copy.copy(self)
+        tiled.driver_codes = self.driver_codes * copies
+        for name in (
+            "base_speed",
+            "_base_aggression",
+            "aggression",
+            "brake_bias",
+            "coast_bias",
+            "tire_wear",
+            "confidence",
+            "fuel_penalty",
+        ):
+            setattr(tiled, name, xp.asarray(np.tile(getattr(self, name), copies)))
+        tiled._rng = xp.random.default_rng(self._seed)
+        return tiled
+
+    def get_actions(self, state, rows):
+        """
+        Decide for every vehicle in `rows` at once.
+
+        Args:
+            state: World.state column arrays
+            rows: Int array of the rows (drivers) to decide for
+
+        Returns:
+            (throttle, brake, steer) float64 arrays aligned with rows
+        """
+        if self._rng is None:
+            self._rng = np.random.default_rng(self._seed)
+
+        x, y = state["x"][rows], state["y"][rows]
+        speed = state["speed"][rows]
+        lap_count = state["lap_count"][rows]
+        base_speed = self.base_speed[rows]
+        brake_bias = self.brake_bias[rows]
+        track_radius = self.track_radius
+
+        # Dynamic adaptation (see DriverStyleController._update_state)
+        tire_wear = np.minimum(1.0, lap_count * 0.12)
+        aggression = np.maximum(0.4, self._base_aggression[rows] - tire_wear * 0.25)
+        fuel_penalty = np.maximum(0.7, 1 - lap_count * 0.05)
+        confidence = self.confidence[rows]
+        confidence = np.where(
+            speed > base_speed * 0.9,
+            np.minimum(1.2, confidence + 0.01),
+            np.maximum(0.8, confidence - 0.002),
+        )
+        self.tire_wear[rows] = tire_wear
+        self.aggression[rows] = aggression
+        self.fuel_penalty[rows] = fuel_penalty
+        self.confidence[rows] = confidence
+
+        # SPEED CONTROL
+        dynamic_speed_target = base_speed * fuel_penalty * confidence
+        below_target = speed < dynamic_speed_target
+        throttle = np.where(
+            below_target,
+            np.minimum(1.0, aggression + 0.15),
+            np.maximum(0.0, (1 - brake_bias) * confidence),
+        )
+        brake = np.where(below_target, 0.0, np.minimum(1.0, brake_bias + tire_wear * 0.3))
+
+        # STEERING CONTROL W/ REAL DRIVER VARIANCE
+        steer_err = np.hypot(x, y) - track_radius
+        steer = (
+            -steer_err / track_radius
+            * (0.15 + aggression * 0.25)
+            * (1 - tire_wear * 0.3)
+        )
+        steer += self._rng.uniform(-0.02, 0.02, len(rows)) * (0.5 + self.coast_bias[rows])
+
+        return (
+            np.round(throttle, 3),
+            np.round(brake, 3),
+            np.clip(np.round(steer, 3), -1.0, 1.0),
+        )
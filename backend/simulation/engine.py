@@ -3,8 +3,11 @@ Engine module: Defines the SimulationEngine that orchestrates the simulation.
 """
 
 import math
+
+import numpy as np
+
 from simulation.world import World
-from simulation.vehicle import Vehicle
+from simulation.vehicle import MAX_TELEMETRY_PREALLOC, Vehicle
 from simulation.events import EventEngine
 
 
@@ -19,7 +22,9 @@ class SimulationEngine:
     - Generate and return race results
     """
 
-    def __init__(self, world, event_engine, vehicle_controllers):
+    def __init__(
+        self, world, event_engine, vehicle_controllers, batch_controller=None, rng=None
+    ):
         """
         Initialize the simulation engine.
 
@@ -27,18 +32,29 @@ class SimulationEngine:
             world: World instance
             event_engine: EventEngine instance
             vehicle_controllers: Dict mapping vehicle_id -> controller instance
+            batch_controller: Optional controller deciding for the whole grid
+                via get_actions(world.state, rows) (e.g.
+                BatchedDriverStyleController); replaces vehicle_controllers
+            rng: Optional numpy Generator for crash checks (default: a
+                freshly seeded one, so each engine/worker gets its own stream)
         """
+        self._rng = rng if rng is not None else np.random.default_rng()
         self.world = world
         self.event_engine = event_engine
         self.vehicle_controllers = vehicle_controllers
+        self.batch_controller = batch_controller
 
         # Race configuration
         self.target_laps = 3  # Number of laps to complete
         self.max_time = 600.0  # Maximum race duration in seconds
+        self._max_steps = self._step_budget()
 
         # Race state
         self.is_race_active = False
         self.race_start_time = None
+        self._finished_count = 0  # Vehicles finished or DNF this race
+        self._vehicle_count = world.get_vehicle_count()
+        self._reset_active()
 
     def set_race_config(self, target_laps=3, max_time=600.0):
         """
@@ -50,13 +66,37 @@ class SimulationEngine:
         """
         self.target_laps = target_laps
         self.max_time = max_time
+        self._max_steps = self._step_budget()
+
+    def _step_budget(self):
+        """
+        Steps per episode to preallocate telemetry for: the episode's upper
+        bound, capped at MAX_TELEMETRY_PREALLOC (also for max_time=inf).
+        """
+        steps = self.max_time / self.world.dt
+        if not math.isfinite(steps):
+            return MAX_TELEMETRY_PREALLOC
+        return min(int(steps) + 1, MAX_TELEMETRY_PREALLOC)
+
+    def _reset_active(self):
+        """Mark every vehicle as racing again."""
+        # Rows still racing, in grid order; step() drops vehicles as they
+        # finish so later steps only touch the rest
+        self._active_idx = np.arange(self._vehicle_count)
+        self._active = list(self.world.get_all_vehicles())
+        # Per-step controls for the scalar controllers are written into this
+        # buffer (sliced to the active count) instead of a fresh array
+        self._controls = np.empty((self._vehicle_count, 3), dtype=np.float64)
 
     def reset_race(self):
         """Reset all state for a new race."""
-        self.world.reset()
+        self.world.reset(self._max_steps)
         self.event_engine.reset()
         self.is_race_active = True
         self.race_start_time = 0.0
+        self._finished_count = 0
+        self._vehicle_count = self.world.get_vehicle_count()
+        self._reset_active()
 
         # Initialize vehicles on the starting line (on the track centerline)
         for vehicle in self.world.get_all_vehicles():
@@ -68,6 +108,8 @@ class SimulationEngine:
 
         for controller in self.vehicle_controllers.values():
             controller.reset()
+        if self.batch_controller is not None:
+            self.batch_controller.reset()
 
     def is_race_finished(self):
         """
@@ -80,14 +122,11 @@ class SimulationEngine:
         Returns:
             True if race should end, False otherwise
         """
-        if self.world.time_elapsed >= self.max_time:
-            return True
-
-        # Check if enough vehicles have finished (either DNF or completed race)
-        vehicles = self.world.get_all_vehicles()
-        finished_count = sum(1 for v in vehicles if v.is_finished)
-
-        return finished_count == len(vehicles)
+        # Every vehicle has finished (either DNF or completed race)
+        return (
+            self._finished_count == self._vehicle_count
+            or self.world.time_elapsed >= self.max_time
+        )
 
     def step(self):
         """
@@ -96,89 +135,133 @@ class SimulationEngine:
         Steps:
         1. Fire scheduled events
         2. Generate random events
-        3. For each vehicle:
-           a. Build observation
-           b. Get action from controller
-           c. Update vehicle physics
-           d. Update lap progress
-           e. Record telemetry
-        4. Check for crashes and engine failures
-        5. Determine race completion
-        6. Advance world time
+        3. For each vehicle, build observation and get action from controller
+        4. Update all vehicle physics, lap progress and telemetry in one
+           compiled pass
+        5. Count completed laps
+        6. Check for crashes and engine failures
+        7. Determine race completion
+        8. Advance world time
         """
         # Fire scheduled and random events
         self.event_engine.fire_scheduled_events(self.world.time_elapsed, self.world)
-        self.event_engine.generate_random_events(self.world.time_elapsed, self.world)
-
-        # Get weather effects
-        weather_effects = self.world.get_weather_effects()
-        friction_mult = weather_effects.get("friction_multiplier", 1.0)
-        weather_effect = weather_effects.get("visibility_multiplier", 1.0)
-
-        # Update each vehicle
-        for vehicle in self.world.get_all_vehicles():
-            if vehicle.is_finished:
-                continue
-
-            # Build observation
-            obs = vehicle.get_state()
-
-            # Get action from controller
-            controller = self.vehicle_controllers.get(vehicle.id)
-            if controller is None:
-                throttle, brake, steer = 0.0, 0.0, 0.0
-            else:
-                throttle, brake, steer = controller.get_action(obs)
-
-            # Update physics
-            vehicle.update_physics(
-                self.world.dt,
-                throttle,
-                brake,
-                steer,
-                friction_mult=friction_mult,
-                weather_effect=weather_effect,
-            )
+        self.event_engine.generate_random_events(
+            self.world.time_elapsed, self.world, self._active
+        )
 
-            # Update lap progress
-            new_progress = self.world.track.progress_from_position(
-                vehicle.x, vehicle.y
+        # Get weather effects (cached by Weather when the weather changes)
+        friction_mult, weather_effect = self.world.weather.multipliers
+
+        dt = self.world.dt
+        now = self.world.time_elapsed
+        state = self.world.state
+        active_idx = self._active_idx
+        active = self._active
+
+        # Failure flags as they stand at the start of the step; only vehicles
+        # with a failure have recovery timers to advance. Usually nobody has
+        # one, and physics reads the live columns; otherwise it gets a copy
+        # taken before the recoveries. The check goes through tolist(): on a
+        # handful of rows ndarray.any() costs several times more.
+        engine_failed = state["is_engine_failed"]
+        impaired = state["is_control_impaired"]
+        if True in engine_failed.tolist() or True in impaired.tolist():
+            engine_failed = engine_failed.copy()
+            impaired = impaired.copy()
+            failing = engine_failed[active_idx] | impaired[active_idx]
+            for k in failing.nonzero()[0].tolist():
+                active[k].update_failures(dt)
+
+        # Gather every active vehicle's action, then step physics as one batch
+        if self.batch_controller is not None:
+            controls = np.column_stack(
+                self.batch_controller.get_actions(state, active_idx)
             )
+        else:
+            # Observations for the whole active grid come from one read of
+            # the state columns; only the controller calls are per vehicle
+            actions = []
+            for vehicle, obs in zip(active, self.world.observations(active_idx)):
+                controller = self.vehicle_controllers.get(vehicle.id)
+                if controller is not None:
+                    actions.append(controller.get_action(obs))
+                else:
+                    actions.append((0.0, 0.0, 0.0))
+            controls = self._controls[: len(actions)]
+            if actions:
+                controls[:] = actions
+
+        # Physics, lap progress and telemetry (finishers included) for the
+        # whole grid in one compiled pass. The kernel cuts throttle for
+        # failed engines and halves impaired steering, using the flags from
+        # the start of the step.
+        lap_done, impaired_count = self.world.advance_vehicles(
+            active_idx,
+            controls,
+            engine_failed,
+            impaired,
+            now,
+            friction_mult=friction_mult,
+            weather_effect=weather_effect,
+        )
 
-            # Check for lap completion
-            if self.world.track.is_lap_complete(new_progress, vehicle.lap_progress):
-                vehicle.increment_lap()
-
-            vehicle.update_lap_progress(new_progress)
-
+        # Race bookkeeping reads the state columns directly; the vehicle
+        # attributes are views onto the same arrays
+        lap_count = state["lap_count"]
+
+        # Only the few vehicles that just crossed the line are visited to
+        # count the lap
+        for k in lap_done:
+            active[k].increment_lap()
+
+        # Crash due to control impairment (probabilistic): 0.3% chance per
+        # timestep when impaired (causes crashes but very rarely). One draw
+        # per racing vehicle, taken only when someone is impaired.
+        if impaired_count:
+            impaired_now = state["is_control_impaired"][active_idx]
+            crashing = impaired_now & (self._rng.random(len(active)) < 0.003)
+            crash_rows = set(active_idx[crashing].tolist())
+        else:
+            crash_rows = ()
+
+        retired = []  # Positions in `active` of vehicles done this step
+        dnf = []  # Rows of the retired ones that keep no telemetry this step
+        for k, (row, vehicle) in enumerate(zip(active_idx.tolist(), active)):
             # Check if vehicle finished (completed target laps)
-            if vehicle.lap_count >= self.target_laps and not vehicle.is_finished:
-                vehicle.finish_race(
-                    position=len([v for v in self.world.get_all_vehicles() if v.is_finished]) + 1,
-                    time=self.world.time_elapsed,
-                )
-
-            # Check for crash due to control impairment (probabilistic)
-            if not vehicle.is_finished and vehicle.is_control_impaired:
-                # 0.3% chance per timestep when impaired (causes crashes but very rarely)
-                import random
-                if random.random() < 0.003:
-                    vehicle.finish_race_dnf("CRASH", self.world.time_elapsed)
-                    continue
+            if lap_count.item(row) >= self.target_laps:
+                self._finished_count += 1
+                vehicle.finish_race(position=self._finished_count, time=now)
+                retired.append(k)
+
+            # Check for crash due to control impairment
+            elif row in crash_rows:
+                self._finished_count += 1
+                vehicle.finish_race_dnf("CRASH", now)
+                retired.append(k)
+                dnf.append(row)
 
             # Check for catastrophic engine failure (cumulative failure too long)
-            if not vehicle.is_finished and vehicle.cumulative_engine_failure_time > 15.0:
-                vehicle.finish_race_dnf("ENGINE_FAILURE", self.world.time_elapsed)
-                continue
+            elif vehicle.cumulative_engine_failure_time > 15.0:
+                self._finished_count += 1
+                vehicle.finish_race_dnf("ENGINE_FAILURE", now)
+                retired.append(k)
+                dnf.append(row)
+
+        if dnf:
+            self.world.discard_telemetry(dnf)
 
-            # Record telemetry
-            vehicle.record_telemetry(self.world.time_elapsed)
+        if retired:
+            self._active_idx = np.delete(active_idx, retired)
+            for k in reversed(retired):
+                del active[k]
 
         # Check for timeout: mark remaining vehicles as DNF at max_time
         if self.world.time_elapsed >= self.max_time:
-            for vehicle in self.world.get_all_vehicles():
-                if not vehicle.is_finished:
-                    vehicle.finish_race_dnf("TIMEOUT", self.world.time_elapsed)
+            for vehicle in self._active:
+                self._finished_count += 1
+                vehicle.finish_race_dnf("TIMEOUT", self.world.time_elapsed)
+            self._active_idx = self._active_idx[:0]
+            self._active = []
 
         # Advance world time
         self.world.step()
@@ -232,7 +315,7 @@ class SimulationEngine:
                         "vehicle_name": vehicle.name,
                         "finish_time": vehicle.finish_time,
                         "lap_count": vehicle.lap_count,
-                        "telemetry_length": len(vehicle.telemetry_history),
+                        "telemetry_length": vehicle.telemetry_length,
                         "event_log": vehicle.event_log,
                     }
                 )
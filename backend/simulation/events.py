@@ -2,7 +2,13 @@
 Events module: Defines the EventEngine for applying scheduled and random events.
 """
 
-import random
+import heapq
+import itertools
+
+import numpy as np
+
+# Uniform draws taken from the Generator per call (see EventEngine._draw)
+_DRAW_BLOCK = 1024
 
 
 class Event:
@@ -20,7 +26,6 @@ class Event:
         self.type = event_type
         self.time = time
         self.params = kwargs
-        self.has_fired = False
 
     def __repr__(self):
         return f"Event(type={self.type}, time={self.time}, params={self.params})"
@@ -34,9 +39,31 @@ class EventEngine:
     Random events are generated based on configured probabilities.
     """
 
-    def __init__(self):
-        """Initialize the event engine."""
+    def __init__(self, rng=None):
+        """
+        Initialize the event engine.
+
+        Args:
+            rng: Optional numpy Generator for random events (default: a
+                freshly seeded one, so each engine/worker gets its own stream)
+        """
+        self._rng = rng if rng is not None else np.random.default_rng()
+        # Buffered uniforms; consumed in order, so the stream matches
+        # drawing each value from the Generator directly
+        self._draws = []
+        self._draw_idx = 0
         self.scheduled_events = []  # List of Event objects
+        # Pending events as a min-heap of (time, seq, Event); popped when fired
+        self._event_heap = []
+        self._event_seq = itertools.count()
+
+        # event.type -> handler(event, world), see _apply_event
+        self._handlers = {
+            "RAIN_ON": self._rain_on,
+            "RAIN_OFF": self._rain_off,
+            "ENGINE_FAILURE": self._engine_failure,
+            "CONTROL_IMPAIRMENT": self._control_impairment,
+        }
         self.random_event_config = {}  # Config for random event generation
         self.events_fired = []  # History of events that have fired
 
@@ -59,6 +86,7 @@ class EventEngine:
         """
         event = Event(event_type, time, **kwargs)
         self.scheduled_events.append(event)
+        heapq.heappush(self._event_heap, (time, next(self._event_seq), event))
 
     def set_random_event_config(self, config):
         """
@@ -71,52 +99,65 @@ class EventEngine:
 
     def fire_scheduled_events(self, current_time, world):
         """
-        Check and fire any scheduled events that should occur at current time.
+        Fire every scheduled event whose time has been reached.
 
         Args:
             current_time: Current simulation time
             world: World instance to apply events to
         """
-        for event in self.scheduled_events:
-            if not event.has_fired and abs(event.time - current_time) < 0.01:
-                # Fire the event
-                self._apply_event(event, world)
-                event.has_fired = True
-                self.events_fired.append(
-                    {"type": event.type, "time": current_time, "params": event.params}
-                )
+        heap = self._event_heap
+        while heap and heap[0][0] <= current_time + 1e-6:
+            _, _, event = heapq.heappop(heap)
+            self._apply_event(event, world)
+            self.events_fired.append(
+                {"type": event.type, "time": current_time, "params": event.params}
+            )
 
-    def generate_random_events(self, current_time, world):
+    def generate_random_events(self, current_time, world, active=None):
         """
         Generate and apply random events based on configured probabilities.
 
         Args:
             current_time: Current simulation time
             world: World instance to apply events to
+            active: Vehicles still racing, in grid order (default: the
+                world's unfinished vehicles); the engine passes its own list
         """
         config = self.random_event_config or self.default_random_config
 
+        # One batch of draws per step: [rain_on, rain_off, engine failure
+        # per active vehicle..., control impairment per active vehicle...]
+        if active is None:
+            vehicles = world.get_all_vehicles()
+            active = [vehicles[row] for row in world.unfinished_rows().tolist()]
+        n = len(active)
+        draws = self._draw(2 + 2 * n)
+
         # Random rain event
-        if random.random() < config.get("rain_on_prob", 0.0):
+        if draws[0] < config.get("rain_on_prob", 0.0):
             world.set_weather(True)
             self.events_fired.append(
                 {"type": "RAIN_ON", "time": current_time, "vehicle_id": None}
             )
 
-        if random.random() < config.get("rain_off_prob", 0.0):
+        if draws[1] < config.get("rain_off_prob", 0.0):
             world.set_weather(False)
             self.events_fired.append(
                 {"type": "RAIN_OFF", "time": current_time, "vehicle_id": None}
             )
 
-        # Random vehicle failures
-        for vehicle in world.get_all_vehicles():
-            if vehicle.is_finished:
-                continue
+        # Random vehicle failures; usually nobody trips, so the
+        # per-vehicle pass is skipped unless some draw is low enough
+        engine_prob = config.get("engine_failure_prob", 0.0)
+        impair_prob = config.get("control_impairment_prob", 0.0)
+        if n == 0 or min(draws[2:]) >= max(engine_prob, impair_prob):
+            return
 
+        for i, vehicle in enumerate(active):
             # Engine failure
-            if random.random() < config.get("engine_failure_prob", 0.0):
-                vehicle.apply_engine_failure(duration=random.uniform(2.0, 5.0))
+            if draws[2 + i] < engine_prob:
+                duration = 2.0 + 3.0 * self._draw(1)[0]
+                vehicle.apply_engine_failure(duration=duration)
                 self.events_fired.append(
                     {
                         "type": "ENGINE_FAILURE",
@@ -126,8 +167,9 @@ class EventEngine:
                 )
 
             # Control impairment
-            if random.random() < config.get("control_impairment_prob", 0.0):
-                vehicle.apply_control_impairment(duration=random.uniform(1.0, 3.0))
+            if draws[2 + n + i] < impair_prob:
+                duration = 1.0 + 2.0 * self._draw(1)[0]
+                vehicle.apply_control_impairment(duration=duration)
                 self.events_fired.append(
                     {
                         "type": "CONTROL_IMPAIRMENT",
@@ -136,6 +178,17 @@ class EventEngine:
                     }
                 )
 
+    def _draw(self, count):
+        """Return the next `count` uniforms in [0, 1) as a list."""
+        i = self._draw_idx
+        if i + count > len(self._draws):
+            # Carry the unread tail over so no value is skipped
+            block = max(_DRAW_BLOCK, count)
+            self._draws = self._draws[i:] + self._rng.random(block).tolist()
+            i = 0
+        self._draw_idx = i + count
+        return self._draws[i : i + count]
+
     def _apply_event(self, event, world):
         """
         Apply an event's effects to the world and vehicles.
@@ -144,35 +197,49 @@ class EventEngine:
             event: Event instance
             world: World instance
         """
-        if event.type == "RAIN_ON":
-            world.set_weather(True)
-
-        elif event.type == "RAIN_OFF":
-            world.set_weather(False)
-
-        elif event.type == "ENGINE_FAILURE":
-            vehicle_id = event.params.get("vehicle_id")
-            if vehicle_id is not None:
-                vehicle = world.get_vehicle(vehicle_id)
-                if vehicle:
-                    duration = event.params.get("duration", 5.0)
-                    vehicle.apply_engine_failure(duration)
-
-        elif event.type == "CONTROL_IMPAIRMENT":
-            vehicle_id = event.params.get("vehicle_id")
-            if vehicle_id is not None:
-                vehicle = world.get_vehicle(vehicle_id)
-                if vehicle:
-                    duration = event.params.get("duration", 3.0)
-                    vehicle.apply_control_impairment(duration)
+        handler = self._handlers.get(event.type)
+        if handler is not None:
+            handler(event, world)
+
+    def _rain_on(self, event, world):
+        """Start rain."""
+        world.set_weather(True)
+
+    def _rain_off(self, event, world):
+        """Stop rain."""
+        world.set_weather(False)
+
+    def _engine_failure(self, event, world):
+        """Fail the target vehicle's engine for params['duration'] (default 5s)."""
+        vehicle = self._event_vehicle(event, world)
+        if vehicle:
+            vehicle.apply_engine_failure(event.params.get("duration", 5.0))
+
+    def _control_impairment(self, event, world):
+        """Impair the target vehicle's steering for params['duration'] (default 3s)."""
+        vehicle = self._event_vehicle(event, world)
+        if vehicle:
+            vehicle.apply_control_impairment(event.params.get("duration", 3.0))
+
+    @staticmethod
+    def _event_vehicle(event, world):
+        """Return the vehicle named by event.params['vehicle_id'], if any."""
+        vehicle_id = event.params.get("vehicle_id")
+        if vehicle_id is None:
+            return None
+        return world.get_vehicle(vehicle_id)
 
     def get_events_fired(self):
         """Return the list of events that have fired during the simulation."""
         return self.events_fired
 
     def reset(self):
-        """Reset the event engine for a new episode."""
-        self.scheduled_events = []
+        """Reset the event engine for a new episode, re-arming the schedule."""
+        self._event_heap = [
+            (event.time, next(self._event_seq), event)
+            for event in self.scheduled_events
+        ]
+        heapq.heapify(self._event_heap)
         self.events_fired = []
 
     def __repr__(self):
@@ -0,0 +1,130 @@
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+from .. import _fast_physics
+from ..models import RACING
+from .simulation_engine import SimulationEngine, track_array
+
+
+# AgentsSoA columns sent back after each batch of steps
+SOA_FIELDS = (
+    "x",
+    "y",
+    "heading",
+    "speed",
+    "lap",
+    "segment_index",
+    "segment_progress",
+    "status",
+)
+
+
+def _engine_actor(
+    conn: Connection,
+    track: np.ndarray,
+    agent_configs: List[Dict[str, Any]],
+    tick_dt: float,
+    max_laps: int,
+    seed: Optional[int],
+) -> None:
+    """
+    Worker process owning one SimulationEngine. Serves ("step_n", n),
+    ("reset", None) and ("close", None) requests until closed.
+    """
+    if seed is not None:
+        _fast_physics.seed(seed)
+    engine = SimulationEngine(
+        track, agent_configs, tick_dt, max_laps, np.random.default_rng(seed)
+    )
+    try:
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "step_n":
+                for _ in range(arg):
+                    view = engine.step_raw()
+                    if np.all(view.status != RACING):
+                        break
+            elif cmd == "reset":
+                engine.reset()
+            elif cmd == "close":
+                break
+            # Only the SoA columns go back, not AgentState objects
+            conn.send((engine.time, {name: getattr(engine.soa, name) for name in SOA_FIELDS}))
+    finally:
+        conn.close()
+
+
+class ParallelEngines:
+    """
+    Independent SimulationEngines, one per worker process, advanced together.
+    Each step_n() call is one round trip per engine: every worker runs `n`
+    ticks, then the call waits for all of them.
+    """
+
+    def __init__(
+        self,
+        track_points: Union[List[Dict[str, float]], np.ndarray],
+        agent_configs: List[Dict[str, Any]],
+        num_envs: int,
+        tick_dt: float = 0.1,
+        max_laps: int = 5,
+        seeds: Optional[List[int]] = None,
+    ):
+        if seeds is not None and len(seeds) != num_envs:
+            raise ValueError(f"Expected {num_envs} seeds, got {len(seeds)}")
+        if not isinstance(track_points, np.ndarray):
+            track_points = track_array(track_points)
+
+        self._conns: List[Connection] = []
+        self._procs: List[Process] = []
+        for k in range(num_envs):
+            parent, child = Pipe()
+            seed = seeds[k] if seeds is not None else None
+            proc = Process(
+                target=_engine_actor,
+                args=(child, track_points, agent_configs, tick_dt, max_laps, seed),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def __len__(self) -> int:
+        return len(self._conns)
+
+    def _call(self, cmd: str, arg: Any = None) -> List[Tuple[float, Dict[str, np.ndarray]]]:
+        # Send to everyone first so the engines run concurrently
+        for conn in self._conns:
+            conn.send((cmd, arg))
+        return [conn.recv() for conn in self._conns]
+
+    def step_n(self, n: int = 1) -> List[Tuple[float, Dict[str, np.ndarray]]]:
+        """
+        Advance every engine `n` ticks (fewer once nobody is racing).
+        Returns (time, SoA columns by SOA_FIELDS name) per engine.
+        """
+        return self._call("step_n", n)
+
+    def reset(self) -> List[Tuple[float, Dict[str, np.ndarray]]]:
+        return self._call("reset")
+
+    def close(self) -> None:
+        for conn, proc in zip(self._conns, self._procs):
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+            proc.join()
+        self._conns.clear()
+        self._procs.clear()
+
+    def __enter__(self) -> "ParallelEngines":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,30 +1,145 @@
-from typing import List, Dict, Any
-import math
-import random
+from collections import deque
+from typing import Deque, List, Dict, Any, NamedTuple, Optional, Tuple, Union
 import time
-from ..models import AgentState, SimulationState # <-- FIX APPLIED HERE
+import numpy as np
+from scipy.spatial import cKDTree
+from ..models import (
+    AgentState,
+    Observation,
+    SimulationState,
+    RACING,
+    FINISHED,
+    DNF,
+    DRY,
+    WET,
+    WEATHER_NAMES,
+)
 
-from .agents import SimpleRuleBasedAgent
-from .aggressive_driver import AggressiveDriverAgent
+from ..agents import BatchController, SimpleRuleBasedAgent
+from ..aggressive_driver import AggressiveDriverAgent
+from .._fast_physics import (
+    PARALLEL_THRESHOLD,
+    TRACK_DX,
+    TRACK_DY,
+    TRACK_HEADING,
+    TRACK_INV_LEN,
+    TRACK_ROWS,
+    TRACK_X,
+    TRACK_Y,
+    advance_agents,
+    advance_agents_parallel,
+)
+
+
+# Most recent event log lines kept (and sent with each SimulationState)
+EVENT_LOG_SIZE = 50
+
+
+def track_array(track_points: List[Dict[str, float]]) -> np.ndarray:
+    """Pack [{"x", "y"}, ...] track points into a contiguous (N, 2) float64 array."""
+    return np.asarray([(p["x"], p["y"]) for p in track_points], dtype=np.float64)
+
+
+class AgentsSoA:
+    """
+    Struct-of-arrays agent storage: one NumPy column per AgentState field,
+    row i is agent i (in config order). Real-valued columns are float32,
+    plenty for this toy track model and half the memory traffic of float64.
+    """
+
+    def __init__(self, n: int, start_x: float, start_y: float):
+        self.x = np.full(n, start_x, dtype=np.float32)
+        self.y = np.full(n, start_y, dtype=np.float32)
+        self.heading = np.zeros(n, dtype=np.float32)
+        self.speed = np.zeros(n, dtype=np.float32)
+        self.lap = np.zeros(n, dtype=np.int32)
+        self.segment_index = np.zeros(n, dtype=np.int32)
+        self.segment_progress = np.zeros(n, dtype=np.float32)
+        self.status = np.full(n, RACING, dtype=np.int8)
+
+    def reset(self, start_x: float, start_y: float) -> None:
+        """Put every agent back on the start line, in place."""
+        self.x.fill(start_x)
+        self.y.fill(start_y)
+        self.heading.fill(0.0)
+        self.speed.fill(0.0)
+        self.lap.fill(0)
+        self.segment_index.fill(0)
+        self.segment_progress.fill(0.0)
+        self.status.fill(RACING)
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+
+class StepView(NamedTuple):
+    """
+    Engine state after a tick, for internal consumers (training loops,
+    workers) that don't need AgentState objects. The arrays are the live
+    AgentsSoA columns and event_tail the live event log: copy to keep them.
+    """
+
+    time: float
+    x: np.ndarray
+    y: np.ndarray
+    heading: np.ndarray
+    speed: np.ndarray
+    lap: np.ndarray
+    segment_index: np.ndarray
+    segment_progress: np.ndarray
+    status: np.ndarray
+    event_tail: Deque[str]
 
 
 class SimulationEngine:
     def __init__(
         self,
-        track_points: List[Dict[str, float]],
+        track_points: Union[List[Dict[str, float]], np.ndarray],
         agent_configs: List[Dict[str, Any]],
         tick_dt: float = 0.1,
         max_laps: int = 5,
+        rng: Optional[np.random.Generator] = None,
     ):
+        # One generator per simulation, shared with its agents, so a seeded
+        # rng reproduces the whole race
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.track_points = track_points
         self.tick_dt = tick_dt
         self.max_laps = max_laps
         self.time = 0.0
-        self.event_log: List[str] = []
-        self.weather: str = "dry"
+        self.event_log: Deque[str] = deque(maxlen=EVENT_LOG_SIZE)
+        self.weather: int = DRY
+
+        # Per-segment geometry (float32, like AgentsSoA), indexed by segment
+        # number. track_points may already be a track_array() (as Monte Carlo
+        # workers pass it).
+        if not isinstance(track_points, np.ndarray):
+            track_points = track_array(track_points)
+        # All tables live in one (TRACK_ROWS, n_seg) array for the agent
+        # kernel; the _seg_* names are views of its rows
+        self._track_table = np.empty((TRACK_ROWS, len(track_points)), dtype=np.float32)
+        self._seg_x = self._track_table[TRACK_X]
+        self._seg_y = self._track_table[TRACK_Y]
+        self._seg_dx = self._track_table[TRACK_DX]
+        self._seg_dy = self._track_table[TRACK_DY]
+        self._inv_seg_len = self._track_table[TRACK_INV_LEN]
+        self._seg_heading = self._track_table[TRACK_HEADING]
+        self._seg_x[:] = track_points[:, 0]
+        self._seg_y[:] = track_points[:, 1]
+        self._seg_dx[:] = np.roll(self._seg_x, -1) - self._seg_x
+        self._seg_dy[:] = np.roll(self._seg_y, -1) - self._seg_y
+        self._seg_len = np.hypot(self._seg_dx, self._seg_dy)
+        # Progress per unit distance, so the tick multiplies instead of divides
+        self._inv_seg_len[:] = 1.0 / np.maximum(self._seg_len, np.float32(1e-6))
+        self._seg_heading[:] = np.degrees(np.arctan2(self._seg_dy, self._seg_dx))
 
-        self.agents: List[AgentState] = []
+        self.agent_ids: List[str] = []
+        self.agent_colors: List[str] = []
         self.agent_controllers = {}
+        # Same controllers by agent row, for the per-tick loop
+        self._controllers: List[Any] = []
+        # One reusable Observation per agent, filled in before each action
+        self._observations: List[Observation] = []
 
         self._init_agents(agent_configs)
 
@@ -38,138 +153,244 @@ class SimulationEngine:
             controller_type = cfg.get("controller", "rule_based")
 
             if controller_type == "aggressive":
-                controller = AggressiveDriverAgent(agent_id, color)
+                controller = AggressiveDriverAgent(agent_id, color, self.rng)
             elif controller_type == "rl":
-                controller = SimpleRuleBasedAgent(agent_id, color, "neutral")
+                controller = SimpleRuleBasedAgent(agent_id, color, "neutral", self.rng)
             else:
-                controller = SimpleRuleBasedAgent(agent_id, color, personality)
+                controller = SimpleRuleBasedAgent(agent_id, color, personality, self.rng)
 
             self.agent_controllers[agent_id] = controller
+            self._controllers.append(controller)
+            self.agent_ids.append(agent_id)
+            self.agent_colors.append(color)
+            self._observations.append(Observation(0.0, 0, 0, 0.0, self.weather))
+
+        # Agents whose controller type offers make_batch() act as one group
+        # per type; the rest are asked one by one
+        by_type: Dict[type, List[int]] = {}
+        for i, controller in enumerate(self._controllers):
+            by_type.setdefault(type(controller), []).append(i)
+        self._ctrl_groups: List[Tuple[BatchController, np.ndarray]] = []
+        solo: List[int] = []
+        for cls, rows in by_type.items():
+            make_batch = getattr(cls, "make_batch", None)
+            if make_batch is None:
+                solo.extend(rows)
+                continue
+            controllers = [self._controllers[i] for i in rows]
+            self._ctrl_groups.append((make_batch(controllers), np.array(rows)))
+        self._solo_rows = np.array(sorted(solo), dtype=np.int64)
 
-            # Start at first segment
-            state = AgentState(
+        # Everyone starts at the first segment
+        n = len(self.agent_ids)
+        self.soa = AgentsSoA(n, self._seg_x[0], self._seg_y[0])
+        self._proximity: Optional[Tuple[cKDTree, np.ndarray]] = None
+        self._throttle = np.zeros(n, dtype=np.float32)
+        self._brake = np.zeros(n, dtype=np.float32)
+
+    @property
+    def status_codes(self) -> np.ndarray:
+        return self.soa.status
+
+    def agent_states(self) -> List[AgentState]:
+        """Materialise the SoA columns as AgentState objects for the API."""
+        soa = self.soa
+        return [
+            AgentState(
                 id=agent_id,
                 color=color,
-                x=self.track_points[0]["x"],
-                y=self.track_points[0]["y"],
-                heading=0.0,
-                speed=0.0,
-                lap=0,
-                status="RACING",
-                segment_index=0,
-                segment_progress=0.0,
+                x=x,
+                y=y,
+                heading=heading,
+                speed=speed,
+                lap=lap,
+                status_code=status,
+                segment_index=seg,
+                segment_progress=prog,
+            )
+            for agent_id, color, x, y, heading, speed, lap, status, seg, prog in zip(
+                self.agent_ids,
+                self.agent_colors,
+                soa.x.tolist(),
+                soa.y.tolist(),
+                soa.heading.tolist(),
+                soa.speed.tolist(),
+                soa.lap.tolist(),
+                soa.status.tolist(),
+                soa.segment_index.tolist(),
+                soa.segment_progress.tolist(),
             )
-            self.agents.append(state)
-
-    def _segment_length(self, i: int) -> float:
-        p1 = self.track_points[i]
-        p2 = self.track_points[(i + 1) % len(self.track_points)]
-        return math.dist((p1["x"], p1["y"]), (p2["x"], p2["y"]))
-
-    def _interpolate_position(self, seg_idx: int, t: float) -> (float, float):
-        p1 = self.track_points[seg_idx]
-        p2 = self.track_points[(seg_idx + 1) % len(self.track_points)]
-        x = p1["x"] + (p2["x"] - p1["x"]) * t
-        y = p1["y"] + (p2["y"] - p1["y"]) * t
-        return x, y
-
-    def _heading_from_segment(self, seg_idx: int) -> float:
-        p1 = self.track_points[seg_idx]
-        p2 = self.track_points[(seg_idx + 1) % len(self.track_points)]
-        angle_rad = math.atan2(p2["y"] - p1["y"], p2["x"] - p1["x"])
-        return math.degrees(angle_rad)
+        ]
 
-    def step(self) -> SimulationState:
+    def _proximity_index(self) -> Tuple[cKDTree, np.ndarray]:
+        """
+        KD-tree over the racing agents' (x, y) and the agent row of each tree
+        point. Built on the first query of a tick, so ticks that never ask
+        for neighbours don't pay for it.
+        """
+        if self._proximity is None:
+            soa = self.soa
+            rows = np.flatnonzero(soa.status == RACING)
+            tree = cKDTree(np.column_stack((soa.x[rows], soa.y[rows])))
+            self._proximity = (tree, rows)
+        return self._proximity
+
+    def get_neighbors(self, i: int, radius: float) -> np.ndarray:
+        """Rows of the racing agents within `radius` of agent i, excluding i."""
+        tree, rows = self._proximity_index()
+        point = (self.soa.x[i], self.soa.y[i])
+        hits = rows[tree.query_ball_point(point, radius, return_sorted=True)]
+        return hits[hits != i]
+
+    def neighbor_pairs(self, radius: float) -> np.ndarray:
+        """(M, 2) agent rows (i < j) of racing agents within `radius` of each other."""
+        tree, rows = self._proximity_index()
+        pairs = tree.query_pairs(radius, output_type="ndarray")
+        return np.sort(rows[pairs], axis=1)
+
+    def _advance(self) -> None:
         self.time += self.tick_dt
+        self._proximity = None  # positions are about to move
 
         # Random weather toggle every ~30s
         if self.time - self._last_weather_toggle > 30.0:
-            if random.random() < 0.2:
-                self.weather = "wet" if self.weather == "dry" else "dry"
+            if self.rng.random() < 0.2:
+                self.weather ^= 1  # DRY <-> WET
                 self._last_weather_toggle = self.time
                 self.event_log.append(
-                    f"[t={self.time:.1f}s] Weather changed to {self.weather.upper()}"
+                    f"[t={self.time:.1f}s] Weather changed to {WEATHER_NAMES[self.weather]}"
                 )
 
-        for i, agent in enumerate(self.agents):
-            if agent.status != "RACING":
-                continue
-
-            controller = self.agent_controllers[agent.id]
-
-            obs = {
-                "speed": agent.speed,
-                "lap": agent.lap,
-                "segment_index": agent.segment_index,
-                "segment_progress": agent.segment_progress,
-                "weather": self.weather,
-            }
+        soa = self.soa
+        racing = np.flatnonzero(soa.status == RACING)
+        if racing.size == 0:
+            return
 
-            action = controller.choose_action(obs)
-            throttle = action["throttle"]
-            brake = action["brake"]
-
-            # Very simple longitudinal dynamics
-            accel = 8.0 * throttle - 10.0 * brake  # m/s^2-ish
-            agent.speed = max(0.0, min(260.0, agent.speed + accel * self.tick_dt))
-
-            # Convert speed km/h ~> "track units" (completely fake scaling)
-            speed_units = agent.speed * 0.01
-
-            seg_len = self._segment_length(agent.segment_index)
-            dist_advance = speed_units * self.tick_dt
-            seg_advance = dist_advance / max(seg_len, 1e-6)
+        # Gather every racing agent's action into the full-grid throttle and
+        # brake arrays: one call per controller group, then the solo agents
+        for controller, rows in self._ctrl_groups:
+            cols = np.flatnonzero(soa.status[rows] == RACING)
+            if cols.size == 0:
+                continue
+            live = rows[cols]
+            self._throttle[live], self._brake[live] = controller.choose_action_batch(
+                cols,
+                soa.speed[live],
+                soa.lap[live],
+                soa.segment_index[live],
+                soa.segment_progress[live],
+                self.weather == WET,
+            )
 
-            agent.segment_progress += seg_advance
+        solo = self._solo_rows[soa.status[self._solo_rows] == RACING].tolist()
+        weather = self.weather
+        for i in solo:
+            obs = self._observations[i]
+            obs.speed = float(soa.speed[i])
+            obs.lap = int(soa.lap[i])
+            obs.segment_index = int(soa.segment_index[i])
+            obs.segment_progress = float(soa.segment_progress[i])
+            obs.weather = weather
+            action = self._controllers[i].choose_action(obs)
+            self._throttle[i] = action["throttle"]
+            self._brake[i] = action["brake"]
+        throttle = self._throttle[racing]
+        brake = self._brake[racing]
 
-            while agent.segment_progress >= 1.0:
-                agent.segment_progress -= 1.0
-                agent.segment_index = (agent.segment_index + 1) % len(
-                    self.track_points
+        # Dynamics, segment wrap, laps and positions in one compiled pass
+        # (threaded for very large grids); only the lap/finish log lines are
+        # written here
+        kernel = advance_agents_parallel if racing.size >= PARALLEL_THRESHOLD else advance_agents
+        laps_done = np.zeros(racing.size, dtype=np.int64)
+        kernel(
+            racing,
+            throttle,
+            brake,
+            soa.speed,
+            soa.segment_index,
+            soa.segment_progress,
+            soa.lap,
+            soa.status,
+            soa.x,
+            soa.y,
+            soa.heading,
+            self._track_table,
+            self.tick_dt,
+            self.max_laps,
+            FINISHED,
+            laps_done,
+        )
+        for k in laps_done.nonzero()[0].tolist():
+            i = racing[k]
+            agent_id = self.agent_ids[i]
+            last_lap = int(soa.lap[i])
+            for lap in range(last_lap - laps_done[k] + 1, last_lap + 1):
+                self.event_log.append(
+                    f"[t={self.time:.1f}s] {agent_id} completed lap {lap}"
+                )
+            if soa.status[i] == FINISHED:
+                self.event_log.append(
+                    f"[t={self.time:.1f}s] {agent_id} finished the race"
                 )
-                # Completed a lap when wrapping around to first segment
-                if agent.segment_index == 0:
-                    agent.lap += 1
-                    self.event_log.append(
-                        f"[t={self.time:.1f}s] {agent.id} completed lap {agent.lap}"
-                    )
-                    if agent.lap >= self.max_laps:
-                        agent.status = "FINISHED"
-                        self.event_log.append(
-                            f"[t={self.time:.1f}s] {agent.id} finished the race"
-                        )
-                        break
-
-            agent.x, agent.y = self._interpolate_position(
-                agent.segment_index, agent.segment_progress
-            )
-            agent.heading = self._heading_from_segment(agent.segment_index)
 
-            # Random mechanical failure
-            if random.random() < 0.0005:
-                agent.status = "DNF"
+        # Random mechanical failure (one draw per agent that started the tick racing)
+        failed = racing[self.rng.random(racing.size) < 0.0005]
+        if failed.size:
+            soa.status[failed] = DNF
+            for i in failed.tolist():
                 self.event_log.append(
-                    f"[t={self.time:.1f}s] {agent.id} retired (mechanical failure)"
+                    f"[t={self.time:.1f}s] {self.agent_ids[i]} retired (mechanical failure)"
                 )
 
-        return SimulationState(time=self.time, agents=self.agents, event_log=self.event_log[-50:])
+    def step(self) -> SimulationState:
+        self._advance()
+        return SimulationState(
+            time=self.time,
+            agents=self.agent_states(),
+            event_log=list(self.event_log),
+            status_codes=self.status_codes,
+        )
+
+    def step_raw(self) -> StepView:
+        """Advance one tick; return a StepView instead of a SimulationState."""
+        self._advance()
+        soa = self.soa
+        return StepView(
+            self.time,
+            soa.x,
+            soa.y,
+            soa.heading,
+            soa.speed,
+            soa.lap,
+            soa.segment_index,
+            soa.segment_progress,
+            soa.status,
+            self.event_log,
+        )
+
+    def step_array(self) -> Tuple[float, np.ndarray, np.ndarray]:
+        """
+        Advance one tick without building a SimulationState.
+        Returns (time, status_codes, finished_mask); status_codes is the
+        engine's live array, so copy it if you need to keep it.
+        """
+        self._advance()
+        return self.time, self.status_codes, self.status_codes == FINISHED
 
     def reset(self) -> SimulationState:
         self.time = 0.0
-        self.weather = "dry"
-        self.event_log = ["[t=0.0s] Simulation reset"]
-        # Re-init agents with same config
-        configs = []
-        for agent in self.agents:
-            configs.append(
-                {
-                    "id": agent.id,
-                    "color": agent.color,
-                    "personality": "neutral",
-                    "controller": "rule_based",
-                }
-            )
-        self.agents.clear()
-        self.agent_controllers.clear()
-        self._init_agents(configs)
-        return SimulationState(time=self.time, agents=self.agents, event_log=self.event_log)
+        self.weather = DRY
+        self.event_log.clear()
+        self.event_log.append("[t=0.0s] Simulation reset")
+        self._last_weather_toggle = 0.0
+        # Same agents and controllers, back on the start line
+        self.soa.reset(self._seg_x[0], self._seg_y[0])
+        self._proximity = None
+        for controller in self._controllers:
+            controller.reset()
+        return SimulationState(
+            time=self.time,
+            agents=self.agent_states(),
+            event_log=list(self.event_log),
+            status_codes=self.status_codes,
+        )
@@ -4,6 +4,20 @@ Track module: Defines the circular racing track geometry and lap tracking.
 
 import math
 
+from numba import njit
+
+
+@njit(cache=True)
+def progress_step(x, y, progress, radius, lap_distance):
+    """
+    Compiled progress_from_position + is_lap_complete for one vehicle.
+
+    Returns (new_progress, lap_done) given the vehicle's previous progress.
+    """
+    new_progress = (math.atan2(y, x) % math.tau) * radius % lap_distance
+    lap_done = progress >= 0.9 * lap_distance and new_progress < 0.1 * lap_distance
+    return new_progress, lap_done
+
 
 class Track:
     """
@@ -22,7 +36,8 @@ class Track:
             radius: Radius of the circular track in meters (default: 100.0)
         """
         self.radius = radius
-        self._lap_distance = 2 * math.pi * radius
+        self._lap_distance = math.tau * radius
+        self._inv_radius = 1.0 / radius  # multiply instead of divide per step
 
     def get_lap_distance(self):
         """Return the total distance of one lap around the track."""
@@ -46,7 +61,7 @@ class Track:
 
         # Convert progress to angle: 0 progress = angle 0 (point (radius, 0))
         # Progress increases counterclockwise
-        angle = normalized / self.radius
+        angle = normalized * self._inv_radius
 
         # Compute Cartesian coordinates on circle
         x = self.radius * math.cos(angle)
@@ -69,12 +84,8 @@ class Track:
         Returns:
             Progress along the centerline (distance from start), within [0, lap_distance)
         """
-        # Calculate angle from origin
-        angle = math.atan2(y, x)
-
-        # Ensure angle is in [0, 2π)
-        if angle < 0:
-            angle += 2 * math.pi
+        # Calculate angle from origin, in [0, 2π)
+        angle = math.atan2(y, x) % math.tau
 
         # Convert angle to progress
         progress = angle * self.radius
@@ -117,7 +128,7 @@ class Track:
         Returns:
             Distance to centerline (0 if on centerline, positive if outside)
         """
-        distance_from_origin = math.sqrt(x**2 + y**2)
+        distance_from_origin = math.hypot(x, y)
         return abs(distance_from_origin - self.radius)
 
     def get_track_bounds(self):
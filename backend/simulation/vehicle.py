@@ -2,6 +2,236 @@
 Vehicle module: Defines the Vehicle class representing a single racing car.
 """
 
+import math
+from collections import namedtuple
+
+import numpy as np
+from numba import njit
+
+
+# Per-vehicle state stored column-wise (one array per field, one row per
+# vehicle) so a World can step and query its whole grid at once
+STATE_DTYPES = {
+    "x": np.float64,
+    "y": np.float64,
+    "speed": np.float64,
+    "heading": np.float64,
+    "lap_progress": np.float64,
+    "lap_count": np.int64,
+    "is_finished": np.bool_,
+    "is_engine_failed": np.bool_,
+    "is_control_impaired": np.bool_,
+}
+STATE_FIELDS = tuple(STATE_DTYPES)
+
+# Converts [steer * speed] to angular change
+STEER_FACTOR = 0.1
+
+# Controller observation returned by Vehicle.get_state and World.observations:
+# the vehicle id, its STATE_FIELDS values in order, then its DNF reason
+Observation = namedtuple(
+    "Observation",
+    [
+        "vehicle_id",
+        "x",
+        "y",
+        "speed",
+        "heading",
+        "lap_progress",
+        "lap_count",
+        "is_finished",
+        "is_engine_failed",
+        "is_control_impaired",
+        "dnf_reason",
+    ],
+)
+
+# Row layout of a vehicle's telemetry buffer, one row per recorded step.
+# float32 is ample for this low-fidelity physics (~1e-5 m on a 100 m track)
+# and halves the buffer; heading is stored unwrapped, so it stays float.
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("timestamp", np.float32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("speed", np.float32),
+        ("heading", np.float32),
+        ("lap_progress", np.float32),
+        ("lap_count", np.int16),
+        ("flags", np.uint8),
+    ]
+)
+TELEMETRY_FIELDS = TELEMETRY_DTYPE.names
+
+# Bits of the telemetry "flags" field
+FLAG_ENGINE_FAILED = 1
+FLAG_CONTROL_IMPAIRED = 2
+
+# Telemetry rows preallocated when the caller doesn't say (grows if exceeded)
+DEFAULT_TELEMETRY_STEPS = 1024
+
+# Most rows an episode's step budget preallocates; covers the default 600 s
+# race at dt=0.05, longer episodes grow the buffer as they go
+MAX_TELEMETRY_PREALLOC = 16 * DEFAULT_TELEMETRY_STEPS
+
+# DNF reasons, indexed by the code stored in event logs and batch state
+DNF_NONE = 0
+DNF_REASONS = (None, "CRASH", "ENGINE_FAILURE", "TIMEOUT")
+_DNF_CODE = {reason: code for code, reason in enumerate(DNF_REASONS)}
+
+# Row layout of a vehicle's event log; "value" is the event's one payload.
+# float64 keeps times and durations exact when decoded back to dicts.
+EVENT_DTYPE = np.dtype(
+    [("type", np.uint8), ("time", np.float64), ("value", np.float64)]
+)
+
+# Event type codes
+EVENT_LAP_COMPLETE = 0
+EVENT_ENGINE_FAILURE = 1
+EVENT_ENGINE_RECOVERED = 2
+EVENT_CONTROL_IMPAIRMENT = 3
+EVENT_CONTROL_RECOVERED = 4
+EVENT_RACE_FINISHED = 5
+EVENT_RACE_DNF = 6
+
+# Per type code: (type name, payload key or None, payload decoder, has time)
+_EVENT_LAYOUT = (
+    ("LAP_COMPLETE", "lap", int, False),
+    ("ENGINE_FAILURE", "duration", float, False),
+    ("ENGINE_RECOVERED", None, None, True),
+    ("CONTROL_IMPAIRMENT", "duration", float, False),
+    ("CONTROL_RECOVERED", None, None, True),
+    ("RACE_FINISHED", "position", int, True),
+    ("RACE_DNF", "reason", lambda code: DNF_REASONS[int(code)], True),
+)
+
+# Event log rows preallocated per vehicle (grows if exceeded)
+DEFAULT_EVENT_LOG_SIZE = 16
+
+
+@njit(cache=True, fastmath=True)
+def vehicle_physics(
+    x,
+    y,
+    speed,
+    heading,
+    throttle,
+    brake,
+    steer,
+    engine_failed,
+    impaired,
+    dt,
+    friction_mult,
+    weather_effect,
+    max_acceleration,
+    max_deceleration,
+    max_speed,
+):
+    """One vehicle's physics step; returns the new (x, y, speed, heading)."""
+    # Clamp inputs to valid ranges
+    thr = min(max(throttle, 0.0), 1.0)
+    brk = min(max(brake, 0.0), 1.0)
+    st = min(max(steer, -1.0), 1.0)
+
+    # A failed engine gives no throttle; impaired steering is halved
+    if engine_failed:
+        thr = 0.0
+    if impaired:
+        st *= 0.5
+
+    # Net acceleration; friction always acts opposite to motion
+    net_acceleration = thr * max_acceleration - brk * max_deceleration
+    if speed > 0:
+        net_acceleration -= 0.5 * friction_mult
+
+    # Update speed, capped by the weather-adjusted max speed
+    speed = min(max(speed + net_acceleration * dt, 0.0), max_speed * weather_effect)
+
+    # Update heading (turning rate proportional to speed and steering input)
+    heading += st * speed * STEER_FACTOR * dt
+
+    x += speed * math.cos(heading) * dt
+    y += speed * math.sin(heading) * dt
+    return x, y, speed, heading
+
+
+@njit(cache=True)
+def write_telemetry(
+    buffer,
+    length,
+    i,
+    timestamp,
+    x,
+    y,
+    speed,
+    heading,
+    lap_progress,
+    lap_count,
+    engine_failed,
+    impaired,
+):
+    """Compiled TelemetryStore.append for row i; the caller checks for room."""
+    record = buffer[i, length[i]]
+    record.timestamp = timestamp
+    record.x = x
+    record.y = y
+    record.speed = speed
+    record.heading = heading
+    record.lap_progress = lap_progress
+    record.lap_count = lap_count
+    record.flags = FLAG_ENGINE_FAILED * engine_failed | FLAG_CONTROL_IMPAIRED * impaired
+    length[i] += 1
+
+
+class TelemetryStore:
+    """
+    Telemetry buffers for a grid of vehicles: buffer[i, :length[i]] holds
+    row i's TELEMETRY_DTYPE records. A World keeps one for its whole grid,
+    so a step's telemetry is written by the same compiled pass as its
+    physics (see World.advance_vehicles) rather than one structured write
+    per vehicle; a standalone Vehicle has a one-row store of its own.
+    """
+
+    def __init__(self, vehicles=1, steps=DEFAULT_TELEMETRY_STEPS):
+        self.buffer = np.empty((vehicles, steps), dtype=TELEMETRY_DTYPE)
+        self.length = np.zeros(vehicles, dtype=np.intp)
+
+    def resize(self, steps):
+        """Make room for `steps` records per row, keeping those that fit."""
+        if steps != self.buffer.shape[1]:
+            keep = min(steps, self.buffer.shape[1])
+            buffer = np.empty((len(self.buffer), steps), dtype=TELEMETRY_DTYPE)
+            buffer[:, :keep] = self.buffer[:, :keep]
+            self.buffer = buffer
+            np.minimum(self.length, steps, out=self.length)
+
+    def grow(self):
+        """Double the records per row; for writers that ran out of room."""
+        self.resize(max(1, 2 * self.buffer.shape[1]))
+
+    def append(self, row, values):
+        """Append one record to `row`, given as a tuple in TELEMETRY_FIELDS order."""
+        i = self.length.item(row)
+        if i == self.buffer.shape[1]:
+            self.grow()
+        self.buffer[row, i] = values
+        self.length[row] = i + 1
+
+
+class _StateField:
+    """Vehicle attribute backed by the vehicle's row in its state columns."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, vehicle, owner=None):
+        if vehicle is None:
+            return self
+        return vehicle._state[self.name].item(vehicle._row)
+
+    def __set__(self, vehicle, value):
+        vehicle._state[self.name][vehicle._row] = value
+
 
 class Vehicle:
     """
@@ -10,8 +240,21 @@ class Vehicle:
     Maintains physics state (position, speed, heading) and race progress tracking.
     Applies simple physics: speed changes via throttle/brake, heading via steering,
     and friction/weather effects.
+
+    The STATE_FIELDS attributes are views into a row of column arrays: the
+    vehicle's own until a World adopts it (see World.add_vehicle).
     """
 
+    x = _StateField()
+    y = _StateField()
+    speed = _StateField()  # m/s
+    heading = _StateField()  # radians, 0 = +x direction
+    lap_progress = _StateField()  # Distance along centerline
+    lap_count = _StateField()  # Number of completed laps
+    is_finished = _StateField()
+    is_engine_failed = _StateField()
+    is_control_impaired = _StateField()
+
     def __init__(
         self,
         vehicle_id,
@@ -44,32 +287,36 @@ class Vehicle:
         self.max_deceleration = max_deceleration
         self.max_steer_rate = max_steer_rate
 
-        # Physics state
-        self.x = 0.0
-        self.y = 0.0
-        self.speed = 0.0  # m/s
-        self.heading = 0.0  # radians, 0 = +x direction
+        # Physics, race progress and failure flags (all zero / False)
+        self._state = {
+            name: np.zeros(1, dtype=dtype) for name, dtype in STATE_DTYPES.items()
+        }
+        self._row = 0
 
         # Race tracking
-        self.lap_progress = 0.0  # Distance along centerline
-        self.lap_count = 0  # Number of completed laps
-        self.is_finished = False
         self.finish_time = None
         self.finish_position = None
         self.dnf_reason = None  # Reason for did-not-finish (if applicable)
 
-        # Failure state
-        self.is_engine_failed = False
-        self.is_control_impaired = False
+        # Failure timers
         self.failure_recovery_time = 0.0
         self.cumulative_engine_failure_time = 0.0  # Track total failure time
 
-        # Telemetry history for analysis
-        self.telemetry_history = []  # List of state dicts at each step
-        self.event_log = []  # List of events that occurred to this vehicle
+        # Telemetry for analysis: this vehicle's row of a TelemetryStore
+        self._telemetry = TelemetryStore()
 
-    def reset(self):
-        """Reset vehicle state for a new episode."""
+        # Events that occurred to this vehicle: EVENT_DTYPE rows
+        self._events = np.empty(DEFAULT_EVENT_LOG_SIZE, dtype=EVENT_DTYPE)
+        self._event_idx = 0
+
+    def reset(self, max_steps=None):
+        """
+        Reset vehicle state for a new episode.
+
+        Args:
+            max_steps: Telemetry rows to preallocate, normally the episode's
+                step budget (default: keep the current buffer size)
+        """
         self.x = 0.0
         self.y = 0.0
         self.speed = 0.0
@@ -84,8 +331,10 @@ class Vehicle:
         self.is_control_impaired = False
         self.failure_recovery_time = 0.0
         self.cumulative_engine_failure_time = 0.0
-        self.telemetry_history = []
-        self.event_log = []
+        self._telemetry.length[self._row] = 0
+        if max_steps is not None:
+            self._telemetry.resize(max_steps)
+        self._event_idx = 0
 
     def update_physics(
         self, dt, throttle, brake, steer, friction_mult=1.0, weather_effect=1.0
@@ -93,6 +342,9 @@ class Vehicle:
         """
         Update vehicle physics for one timestep.
 
+        The engine steps all vehicles at once via World.advance_vehicles; this
+        is the single-vehicle equivalent, calling the same compiled kernel.
+
         Args:
             dt: Time delta in seconds
             throttle: Throttle input in [0, 1] (0 = no throttle, 1 = full)
@@ -101,60 +353,68 @@ class Vehicle:
             friction_mult: Multiplier for friction (1.0 = normal, >1 = more friction)
             weather_effect: Multiplier for weather effects on max speed (1.0 = clear, <1 = rain/fog)
         """
+        engine_failed, impaired = self.update_failures(dt)
+
+        state, row = self._state, self._row
+        (
+            state["x"][row],
+            state["y"][row],
+            state["speed"][row],
+            state["heading"][row],
+        ) = vehicle_physics(
+            state["x"].item(row),
+            state["y"].item(row),
+            state["speed"].item(row),
+            state["heading"].item(row),
+            float(throttle),
+            float(brake),
+            float(steer),
+            engine_failed,
+            impaired,
+            float(dt),
+            float(friction_mult),
+            float(weather_effect),
+            float(self.max_acceleration),
+            float(self.max_deceleration),
+            float(self.max_speed),
+        )
+
+    def update_failures(self, dt):
+        """
+        Advance failure recovery timers by one timestep.
+
+        Args:
+            dt: Time delta in seconds
+
+        Returns:
+            (engine_failed, control_impaired) as they were at the start of the
+            step, i.e. whether this step's throttle is cut / steering halved
+        """
+        engine_failed = self.is_engine_failed
+        impaired = self.is_control_impaired
+
         # Handle engine failure
-        if self.is_engine_failed:
-            throttle = 0.0
+        if engine_failed:
             self.cumulative_engine_failure_time += dt
             self.failure_recovery_time -= dt
             if self.failure_recovery_time <= 0:
                 self.is_engine_failed = False
-                self.event_log.append(
-                    {"type": "ENGINE_RECOVERED", "time": dt}
-                )
-
-        # Clamp inputs to valid ranges
-        throttle = max(0.0, min(1.0, throttle))
-        brake = max(0.0, min(1.0, brake))
-        steer = max(-1.0, min(1.0, steer))
-
-        # Calculate net acceleration
-        accel_from_throttle = throttle * self.max_acceleration
-        accel_from_brake = -brake * self.max_deceleration
-
-        net_acceleration = accel_from_throttle + accel_from_brake
-
-        # Apply friction (always acts opposite to motion)
-        friction_deceleration = 0.5 * friction_mult
-        if self.speed > 0:
-            net_acceleration -= friction_deceleration
-
-        # Update speed
-        self.speed += net_acceleration * dt
-
-        # Apply weather effect to max speed
-        effective_max_speed = self.max_speed * weather_effect
-        self.speed = max(0.0, min(self.speed, effective_max_speed))
+                self._log_event(EVENT_ENGINE_RECOVERED, time=dt)
 
         # Handle control impairment
-        if self.is_control_impaired:
-            steer *= 0.5  # Reduce steering effectiveness
+        if impaired:
             self.failure_recovery_time -= dt
             if self.failure_recovery_time <= 0:
                 self.is_control_impaired = False
-                self.event_log.append(
-                    {"type": "CONTROL_RECOVERED", "time": dt}
-                )
-
-        # Update heading (turning rate proportional to speed and steering input)
-        steer_factor = 0.1  # Converts [steer * speed] to angular change
-        heading_change = steer * self.speed * steer_factor * dt
-        self.heading += heading_change
+                self._log_event(EVENT_CONTROL_RECOVERED, time=dt)
 
-        # Update position
-        import math
+        return engine_failed, impaired
 
-        self.x += self.speed * math.cos(self.heading) * dt
-        self.y += self.speed * math.sin(self.heading) * dt
+    def _bind(self, state, row, telemetry):
+        """Point this vehicle's fields and telemetry at row `row` of these stores."""
+        self._state = state
+        self._row = row
+        self._telemetry = telemetry
 
     def update_lap_progress(self, new_progress):
         """
@@ -174,9 +434,7 @@ class Vehicle:
     def increment_lap(self):
         """Record that the vehicle has completed another lap."""
         self.lap_count += 1
-        self.event_log.append(
-            {"type": "LAP_COMPLETE", "lap": self.lap_count}
-        )
+        self._log_event(EVENT_LAP_COMPLETE, value=self.lap_count)
 
     def apply_engine_failure(self, duration=5.0):
         """
@@ -188,9 +446,7 @@ class Vehicle:
         if not self.is_engine_failed:
             self.is_engine_failed = True
             self.failure_recovery_time = duration
-            self.event_log.append(
-                {"type": "ENGINE_FAILURE", "duration": duration}
-            )
+            self._log_event(EVENT_ENGINE_FAILURE, value=duration)
 
     def apply_control_impairment(self, duration=3.0):
         """
@@ -202,32 +458,32 @@ class Vehicle:
         if not self.is_control_impaired:
             self.is_control_impaired = True
             self.failure_recovery_time = duration
-            self.event_log.append(
-                {"type": "CONTROL_IMPAIRMENT", "duration": duration}
-            )
+            self._log_event(EVENT_CONTROL_IMPAIRMENT, value=duration)
 
     def get_state(self):
         """
-        Return the current vehicle state as an observation dict.
+        Return the current vehicle state as an observation.
 
         Used by controllers to make decisions.
 
         Returns:
-            Dict with current state information
+            Observation namedtuple with current state information
         """
-        return {
-            "vehicle_id": self.id,
-            "x": self.x,
-            "y": self.y,
-            "speed": self.speed,
-            "heading": self.heading,
-            "lap_progress": self.lap_progress,
-            "lap_count": self.lap_count,
-            "is_finished": self.is_finished,
-            "is_engine_failed": self.is_engine_failed,
-            "is_control_impaired": self.is_control_impaired,
-            "dnf_reason": self.dnf_reason,
-        }
+        # Read the state row directly; this runs once per vehicle per step
+        state, row = self._state, self._row
+        return Observation(
+            self.id,
+            state["x"].item(row),
+            state["y"].item(row),
+            state["speed"].item(row),
+            state["heading"].item(row),
+            state["lap_progress"].item(row),
+            state["lap_count"].item(row),
+            state["is_finished"].item(row),
+            state["is_engine_failed"].item(row),
+            state["is_control_impaired"].item(row),
+            self.dnf_reason,
+        )
 
     def record_telemetry(self, timestamp):
         """
@@ -236,13 +492,63 @@ class Vehicle:
         Args:
             timestamp: Current simulation time
         """
-        state = self.get_state()
-        state["timestamp"] = timestamp
-        self.telemetry_history.append(state)
+        state, row = self._state, self._row
+        self._telemetry.append(
+            row,
+            (
+                timestamp,
+                state["x"].item(row),
+                state["y"].item(row),
+                state["speed"].item(row),
+                state["heading"].item(row),
+                state["lap_progress"].item(row),
+                state["lap_count"].item(row),
+                FLAG_ENGINE_FAILED * state["is_engine_failed"].item(row)
+                | FLAG_CONTROL_IMPAIRED * state["is_control_impaired"].item(row),
+            ),
+        )
+
+    @property
+    def telemetry_length(self):
+        """Number of telemetry rows recorded this episode."""
+        return self._telemetry.length.item(self._row)
+
+    def telemetry_array(self):
+        """Return the recorded telemetry as a TELEMETRY_DTYPE structured view."""
+        return self._telemetry.buffer[self._row, : self.telemetry_length]
+
+    def as_records(self):
+        """Return the telemetry as a list of dicts keyed by TELEMETRY_FIELDS."""
+        return [
+            dict(zip(TELEMETRY_FIELDS, values))
+            for values in self.telemetry_array().tolist()
+        ]
 
     def get_telemetry(self):
         """Return the telemetry history for this vehicle."""
-        return self.telemetry_history
+        return self.as_records()
+
+    def _log_event(self, code, value=0.0, time=0.0):
+        """Append an EVENT_DTYPE row to this vehicle's event log."""
+        i = self._event_idx
+        if i == len(self._events):
+            self._events = np.concatenate([self._events, np.empty_like(self._events)])
+        self._events[i] = (code, time, value)
+        self._event_idx = i + 1
+
+    @property
+    def event_log(self):
+        """Events that occurred to this vehicle, decoded to a list of dicts."""
+        log = []
+        for code, time, value in self._events[: self._event_idx].tolist():
+            name, key, decode, has_time = _EVENT_LAYOUT[code]
+            event = {"type": name}
+            if key is not None:
+                event[key] = decode(value)
+            if has_time:
+                event["time"] = time
+            log.append(event)
+        return log
 
     def finish_race(self, position, time):
         """
@@ -255,9 +561,7 @@ class Vehicle:
         self.is_finished = True
         self.finish_position = position
         self.finish_time = time
-        self.event_log.append(
-            {"type": "RACE_FINISHED", "position": position, "time": time}
-        )
+        self._log_event(EVENT_RACE_FINISHED, value=position, time=time)
 
     def finish_race_dnf(self, reason, time):
         """
@@ -270,9 +574,7 @@ class Vehicle:
         self.is_finished = True
         self.dnf_reason = reason
         self.finish_time = time
-        self.event_log.append(
-            {"type": "RACE_DNF", "reason": reason, "time": time}
-        )
+        self._log_event(EVENT_RACE_DNF, value=_DNF_CODE[reason], time=time)
 
     def __repr__(self):
         return (
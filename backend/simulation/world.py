@@ -2,7 +2,105 @@
 World module: Defines the World class that manages simulation state.
 """
 
-from simulation.track import Track
+import numpy as np
+from numba import njit
+
+from simulation.track import Track, progress_step
+from simulation.vehicle import (
+    DEFAULT_TELEMETRY_STEPS,
+    STATE_DTYPES,
+    STATE_FIELDS,
+    Observation,
+    TelemetryStore,
+    vehicle_physics,
+    write_telemetry,
+)
+
+_new_tuple = tuple.__new__
+
+# One record per vehicle holding its STATE_FIELDS; World.state's columns
+# are views of these fields
+_STATE_RECORD_DTYPE = np.dtype(list(STATE_DTYPES.items()), align=True)
+
+
+@njit(cache=True)
+def _advance_kernel(
+    x,
+    y,
+    speed,
+    heading,
+    lap_progress,
+    lap_count,
+    is_engine_failed,
+    is_control_impaired,
+    max_speed,
+    max_acceleration,
+    max_deceleration,
+    lap_done,
+    rows,
+    controls,
+    engine_failed,
+    impaired,
+    buffer,
+    length,
+    dt,
+    friction_mult,
+    weather_effect,
+    radius,
+    lap_distance,
+    timestamp,
+):
+    """
+    Compiled body of World.advance_vehicles. Sets lap_done[k] for rows[k]
+    and returns (laps completed, impaired count); laps is -1, with nothing
+    written, if a telemetry row is full.
+    """
+    for k in range(rows.shape[0]):
+        if length[rows[k]] == buffer.shape[1]:
+            return -1, 0
+
+    laps = 0
+    impaired_count = 0
+    for k in range(rows.shape[0]):
+        i = rows[k]
+        x[i], y[i], speed[i], heading[i] = vehicle_physics(
+            x[i],
+            y[i],
+            speed[i],
+            heading[i],
+            controls[k, 0],
+            controls[k, 1],
+            controls[k, 2],
+            engine_failed[i],
+            impaired[i],
+            dt,
+            friction_mult,
+            weather_effect,
+            max_acceleration[i],
+            max_deceleration[i],
+            max_speed[i],
+        )
+        lap_progress[i], lap_done[k] = progress_step(
+            x[i], y[i], lap_progress[i], radius, lap_distance
+        )
+        # Vehicle.increment_lap counts the lap afterwards; the record has it
+        write_telemetry(
+            buffer,
+            length,
+            i,
+            timestamp,
+            x[i],
+            y[i],
+            speed[i],
+            heading[i],
+            lap_progress[i],
+            lap_count[i] + lap_done[k],
+            is_engine_failed[i],
+            is_control_impaired[i],
+        )
+        laps += lap_done[k]
+        impaired_count += is_control_impaired[i]
+    return laps, impaired_count
 
 
 class Weather:
@@ -13,6 +111,8 @@ class Weather:
         self.is_raining = False
         self.friction_multiplier = 1.0  # 1.0 = normal, >1 = slippery
         self.visibility_multiplier = 1.0  # 1.0 = clear, <1 = fog
+        # (friction_multiplier, visibility_multiplier), refreshed by set_rain
+        self.multipliers = (1.0, 1.0)
 
     def set_rain(self, is_raining):
         """
@@ -28,6 +128,7 @@ class Weather:
         else:
             self.friction_multiplier = 1.0
             self.visibility_multiplier = 1.0
+        self.multipliers = (self.friction_multiplier, self.visibility_multiplier)
 
     def get_effects(self):
         """
@@ -71,14 +172,167 @@ class World:
         self.vehicles = {}  # Dict mapping vehicle_id -> Vehicle
         self.weather = Weather()
 
+        # Grid-wide vehicle state: one array per STATE_DTYPES entry,
+        # row i = i-th vehicle in self.vehicles order
+        self._rebuild_vehicle_arrays()
+
     def add_vehicle(self, vehicle):
         """
         Add a vehicle to the world.
 
+        The vehicle's state and telemetry move into the world's arrays and
+        the vehicle becomes a view onto its row.
+
         Args:
             vehicle: Vehicle instance to add
         """
         self.vehicles[vehicle.id] = vehicle
+        self._rebuild_vehicle_arrays()
+
+    def _rebuild_vehicle_arrays(self):
+        """Re-pack every vehicle's state, limits and telemetry into grid arrays."""
+        vehicles = list(self.vehicles.values())
+        # The columns are fields of one record array, so observations()
+        # reads every row, as plain Python values, with a single tolist()
+        records = np.zeros(len(vehicles), dtype=_STATE_RECORD_DTYPE)
+        for name in STATE_FIELDS:
+            records[name] = [getattr(v, name) for v in vehicles]
+        state = {name: records[name] for name in STATE_FIELDS}
+        telemetry = TelemetryStore(
+            len(vehicles),
+            max([DEFAULT_TELEMETRY_STEPS] + [v.telemetry_length for v in vehicles]),
+        )
+        for row, vehicle in enumerate(vehicles):
+            recorded = vehicle.telemetry_array()
+            telemetry.buffer[row, : len(recorded)] = recorded
+            telemetry.length[row] = len(recorded)
+            vehicle._bind(state, row, telemetry)
+
+        self._veh_state = state
+        self._state_records = records
+        self._telemetry = telemetry
+        self._grid_vehicles = vehicles
+
+        # Grid-wide arrays _advance_kernel reads before its per-step
+        # arguments, prebuilt rather than looked up every step
+        self._grid_arrays = (
+            state["x"],
+            state["y"],
+            state["speed"],
+            state["heading"],
+            state["lap_progress"],
+            state["lap_count"],
+            state["is_engine_failed"],
+            state["is_control_impaired"],
+            np.array([v.max_speed for v in vehicles], dtype=np.float64),
+            np.array([v.max_acceleration for v in vehicles], dtype=np.float64),
+            np.array([v.max_deceleration for v in vehicles], dtype=np.float64),
+            np.zeros(len(vehicles), dtype=np.bool_),  # lap_done output
+        )
+
+    @property
+    def state(self):
+        """
+        Column arrays of vehicle state keyed by STATE_FIELDS; row i belongs
+        to get_all_vehicles()[i]. Writes go straight to the vehicles.
+        """
+        return self._veh_state
+
+    def unfinished_rows(self):
+        """Return the rows of vehicles that are still racing."""
+        return (~self._veh_state["is_finished"]).nonzero()[0]
+
+    def advance_vehicles(
+        self,
+        rows,
+        controls,
+        engine_failed,
+        impaired,
+        timestamp,
+        friction_mult=1.0,
+        weather_effect=1.0,
+    ):
+        """
+        Step the physics of several vehicles (see Vehicle.update_physics),
+        update their lap progress and record their telemetry in one
+        compiled pass.
+
+        Completed laps are reported, not counted: the caller still calls
+        Vehicle.increment_lap for them, though their telemetry rows already
+        include the new lap.
+
+        Args:
+            rows: Int array of rows (positions in get_all_vehicles())
+            controls: Float (len(rows), 3) array of (throttle, brake, steer)
+            engine_failed, impaired: Bool arrays indexed by row (like the
+                state columns): the failure flags as they stood before this
+                step's Vehicle.update_failures calls (no throttle / halved
+                steering)
+            timestamp: Simulation time to record in the telemetry
+            friction_mult: Weather friction multiplier
+            weather_effect: Weather multiplier on max speed
+
+        Returns:
+            (lap_done, impaired_count): positions in rows of the vehicles
+            that just completed a lap (usually none), and how many of the
+            rows have impaired control
+        """
+        telemetry = self._telemetry
+        track = self.track
+        while True:
+            laps, impaired_count = _advance_kernel(
+                *self._grid_arrays,
+                rows,
+                controls,
+                engine_failed,
+                impaired,
+                telemetry.buffer,
+                telemetry.length,
+                float(self.dt),
+                float(friction_mult),
+                float(weather_effect),
+                float(track.radius),
+                track.get_lap_distance(),
+                float(timestamp),
+            )
+            if laps >= 0:
+                break
+            telemetry.grow()
+
+        if laps:
+            lap_done = self._grid_arrays[-1][: len(rows)].nonzero()[0].tolist()
+        else:
+            lap_done = ()
+        return lap_done, impaired_count
+
+    def discard_telemetry(self, rows):
+        """Drop the telemetry row advance_vehicles last recorded for `rows`."""
+        self._telemetry.length[rows] -= 1
+
+    def observations(self, rows):
+        """
+        Build controller observations (see Vehicle.get_state) for several
+        vehicles, reading each state column once rather than per vehicle.
+
+        Args:
+            rows: Int array of rows (positions in get_all_vehicles())
+
+        Returns:
+            List of Observation namedtuples aligned with rows
+        """
+        # Per-row STATE_FIELDS tuples, in the order Observation expects them
+        values = self._state_records.tolist()
+        vehicles = self._grid_vehicles
+        observations = []
+        for row in rows.tolist():
+            vehicle = vehicles[row]
+            # tuple.__new__ skips the namedtuple's Python-level __new__
+            observations.append(
+                _new_tuple(
+                    Observation, (vehicle.id, *values[row], vehicle.dnf_reason)
+                )
+            )
+        return observations
 
     def get_vehicle(self, vehicle_id):
         """
@@ -130,14 +384,19 @@ class World:
 
         self.time_elapsed += dt
 
-    def reset(self):
-        """Reset the world state for a new episode."""
+    def reset(self, max_steps=None):
+        """
+        Reset the world state for a new episode.
+
+        Args:
+            max_steps: Episode step budget, used to size vehicle telemetry
+        """
         self.time_elapsed = 0.0
         self.weather = Weather()
 
         # Reset all vehicles
         for vehicle in self.vehicles.values():
-            vehicle.reset()
+            vehicle.reset(max_steps)
 
     def get_state(self):
         """
@@ -148,7 +407,7 @@ class World:
         """
         vehicle_states = []
         for vehicle in self.vehicles.values():
-            state = vehicle.get_state()
+            state = vehicle.get_state()._asdict()
             vehicle_states.append(state)
 
         return {